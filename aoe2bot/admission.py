@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
+from discord.ext import commands  # type: ignore
+
+
+class RateLimited(commands.CommandError):
+    """Raised when a user or guild has spent its command budget."""
+
+    retry_after: float
+    scope: str
+
+    def __init__(self, retry_after: float, scope: str) -> None:
+        """
+        :param retry_after: Seconds until the command can be afforded
+        :param scope: What ran out of budget, user or guild
+        """
+        self.retry_after = retry_after
+        self.scope = scope
+        super().__init__(f"Rate limited per {scope}, retry in {retry_after:.0f}s")
+
+
+class Overloaded(commands.CommandError):
+    """Raised when a command class is at capacity and its queue is full."""
+
+    command_class: str
+
+    def __init__(self, command_class: str) -> None:
+        """
+        :param command_class: The command class that is at capacity
+        """
+        self.command_class = command_class
+        super().__init__(f"Too many {command_class} commands queued")
+
+
+class TokenBucket:
+    """A bucket of `capacity` tokens refilled at `rate` tokens per second."""
+
+    _capacity: float
+    _rate: float
+    _tokens: float
+    _last: float
+
+    def __init__(self, capacity: float, rate: float) -> None:
+        self._capacity = capacity
+        self._rate = rate
+        self._tokens = capacity
+        self._last = time.monotonic()
+
+    def _refill(self) -> None:
+        now: float = time.monotonic()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._last) * self._rate
+        )
+        self._last = now
+
+    def consume(self, cost: float) -> float:
+        """
+        Takes tokens from the bucket if there are enough.
+
+        :param cost: The number of tokens
+        :return: 0 if the tokens were taken, otherwise the seconds until there will be enough
+        """
+        self._refill()
+        cost = min(cost, self._capacity)
+        if self._tokens >= cost:
+            self._tokens -= cost
+            return 0.0
+        return (cost - self._tokens) / self._rate
+
+    def refund(self, cost: float) -> None:
+        """
+        Returns tokens to the bucket.
+
+        :param cost: The number of tokens
+        """
+        self._tokens = min(self._capacity, self._tokens + cost)
+
+    @property
+    def full(self) -> bool:
+        self._refill()
+        return self._tokens >= self._capacity
+
+
+class Admission:
+    """
+    Admission control in front of command dispatch.
+
+    Every command costs tokens from its user's and its guild's bucket, and expensive commands belong to a class with a
+    bounded number of concurrent invocations. Commands over a limit are rejected or queued, so one noisy user can not
+    take the event loop or the upstream API quota from everyone else.
+    """
+
+    log: logging.Logger
+
+    _costs: Dict[str, float] = {
+        "civs": 2.0,
+        "elo": 1.0,
+        "history": 0.5,
+        "meta": 0.5,
+        "taunt": 1.0,
+    }
+    _classes: Dict[str, str] = {
+        "civs": "report",
+        "elo": "lookup",
+        "history": "lookup",
+        "taunt": "voice",
+    }
+    _limits: Dict[str, int] = {"report": 2, "lookup": 4, "voice": 8}
+    # always admitted, so a user out of budget can still stop a loop or read the help
+    _free: Set[str] = {"help", "stop"}
+
+    _user: Tuple[float, float]
+    _guild: Tuple[float, float]
+    _queue_depth: int
+    _min_taunt_delay: float
+
+    _user_buckets: Dict[int, TokenBucket]
+    _guild_buckets: Dict[int, TokenBucket]
+    _semaphores: Dict[str, asyncio.Semaphore]
+    _waiting: Dict[str, int]
+
+    _max_buckets: int = 10000
+
+    def __init__(
+        self,
+        user_capacity: float = 10.0,
+        user_rate: float = 0.2,
+        guild_capacity: float = 40.0,
+        guild_rate: float = 1.0,
+        queue_depth: int = 10,
+        min_taunt_delay: float = 5.0,
+    ) -> None:
+        """
+        :param user_capacity: The burst of tokens a user can spend
+        :param user_rate: The tokens per second a user's budget refills
+        :param guild_capacity: The burst of tokens a guild can spend
+        :param guild_rate: The tokens per second a guild's budget refills
+        :param queue_depth: The number of commands that may wait per command class before new ones are rejected
+        :param min_taunt_delay: Looping taunts with a shorter delay cost proportionally more per repeat
+        """
+        self.log = logging.getLogger(f"{self.__class__.__name__}")
+
+        self._user = (user_capacity, user_rate)
+        self._guild = (guild_capacity, guild_rate)
+        self._queue_depth = queue_depth
+        self._min_taunt_delay = min_taunt_delay
+
+        self._user_buckets = {}
+        self._guild_buckets = {}
+        self._semaphores = {
+            name: asyncio.Semaphore(limit) for name, limit in self._limits.items()
+        }
+        self._waiting = {name: 0 for name in self._limits}
+
+    def cost(self, ctx: commands.Context) -> float:
+        """
+        The number of tokens a command invocation costs, after its arguments are parsed.
+
+        :param ctx: The command context
+        :return: The cost
+        """
+        name: str = ctx.command.qualified_name
+        cost: float = self._costs.get(name, 0.5)
+        # cog commands are invoked with the cog and the context ahead of the arguments
+        args: Dict[str, Any] = dict(zip(ctx.command.clean_params, ctx.args[2:]))
+        if name == "civs":
+            cost += str(args.get("names", "")).count(",") + 1
+        elif name == "taunt":
+            cost = self.repeat_cost(args.get("delay"))
+        return cost
+
+    def repeat_cost(self, delay: Optional[int]) -> float:
+        """
+        The number of tokens a taunt play costs.
+
+        :param delay: The loop delay, None if the taunt is not looped
+        :return: The cost
+        """
+        cost: float = self._costs["taunt"]
+        if delay:
+            cost *= max(1.0, self._min_taunt_delay / max(float(delay), 1.0))
+        return cost
+
+    def _bucket(
+        self, buckets: Dict[int, TokenBucket], key: int, config: Tuple[float, float]
+    ) -> TokenBucket:
+        bucket: Optional[TokenBucket] = buckets.get(key)
+        if bucket is None:
+            if len(buckets) >= self._max_buckets:
+                # full buckets are the same as new ones, so they are safe to drop
+                for full in [k for k, b in buckets.items() if b.full]:
+                    del buckets[full]
+            bucket = buckets[key] = TokenBucket(*config)
+        return bucket
+
+    def charge(self, ctx: commands.Context, cost: float) -> None:
+        """
+        Takes tokens from the user's and guild's buckets.
+
+        :param ctx: The command context
+        :param cost: The number of tokens
+        :raises: RateLimited if either bucket does not have enough tokens, neither is charged then
+        """
+        user: TokenBucket = self._bucket(self._user_buckets, ctx.author.id, self._user)
+        retry_after: float = user.consume(cost)
+        if retry_after:
+            raise RateLimited(retry_after, "user")
+
+        if ctx.guild is None:
+            return
+        guild: TokenBucket = self._bucket(
+            self._guild_buckets, ctx.guild.id, self._guild
+        )
+        retry_after = guild.consume(cost)
+        if retry_after:
+            user.refund(cost)
+            raise RateLimited(retry_after, "guild")
+
+    async def admit(self, ctx: commands.Context) -> None:
+        """
+        Charges a command and waits for a slot in its command class.
+
+        :param ctx: The command context
+        :raises: RateLimited if the user or guild is over budget, Overloaded if the command class queue is full
+        """
+        if ctx.command.qualified_name in self._free:
+            return
+
+        self.charge(ctx, self.cost(ctx))
+
+        command_class: Optional[str] = self._classes.get(ctx.command.qualified_name)
+        if command_class is None:
+            return
+
+        semaphore: asyncio.Semaphore = self._semaphores[command_class]
+        if semaphore.locked():
+            if self._waiting[command_class] >= self._queue_depth:
+                raise Overloaded(command_class)
+            try:
+                self._waiting[command_class] += 1
+                await ctx.send(
+                    f"Busy, you are #{self._waiting[command_class]} in the queue."
+                )
+                await semaphore.acquire()
+            finally:
+                self._waiting[command_class] -= 1
+        else:
+            await semaphore.acquire()
+        ctx.admission_class = command_class
+
+    def release(self, ctx: commands.Context) -> None:
+        """
+        Frees the command class slot taken by `admit`.
+
+        :param ctx: The command context
+        """
+        command_class: Optional[str] = getattr(ctx, "admission_class", None)
+        if command_class is not None:
+            self._semaphores[command_class].release()
+            ctx.admission_class = None
@@ -6,13 +6,36 @@ from typing import Optional
 import discord  # type: ignore
 from discord.ext import commands  # type: ignore
 
-from aoe2bot.cogs import civs, elo, error, taunt
+from aoe2bot import logs
+from aoe2bot.admission import Admission
+from aoe2bot.cache import SharedCache
+from aoe2bot.cogs import (
+    admin,
+    civs,
+    elo,
+    error,
+    history,
+    meta,
+    prefetch,
+    snapshot,
+    taunt,
+    voice,
+)
+from aoe2bot.history import RatingHistory
+from aoe2bot.popularity import Popularity
+from aoe2bot.workers import WorkerPool
 
 
-class AoE2Bot(commands.Bot):
+class AoE2Bot(commands.AutoShardedBot):
     """An AoE2 Discord Bot"""
 
     log: logging.Logger
+    cache: SharedCache
+    workers: WorkerPool
+    popularity: Popularity
+    admission: Admission
+    history: RatingHistory
+    snapshots: snapshot.Snapshot
     __token: Optional[str] = None
 
     async def on_ready(self) -> None:
@@ -23,16 +46,93 @@ class AoE2Bot(commands.Bot):
         """
         self.log.debug(f"Logged in as {self.user}")
 
+    async def before_command(self, ctx: commands.Context) -> None:
+        """
+        Tags the command's log records with the command name and request id, then admits it.
+
+        :param ctx: The command context
+        """
+        logs.bind(ctx.command.qualified_name, ctx.message.id)
+        await self.admission.admit(ctx)
+
+    async def after_command(self, ctx: commands.Context) -> None:
+        """
+        Releases the command's admission slot.
+
+        :param ctx: The command context
+        """
+        self.admission.release(ctx)
+
     def add_cogs(self) -> None:
         """Adds all cogs"""
-        self.add_cog(elo.ELO(self, self.__class__.__name__))
-        self.add_cog(taunt.Taunt(self, self.__class__.__name__, space=self.__digital_ocean_space_name))
-        self.add_cog(civs.Civs(self, self.__class__.__name__))
+        voice_pool: voice.VoicePool = voice.VoicePool(self, self.__class__.__name__)
+        self.add_cog(voice_pool)
+        self.snapshots = snapshot.Snapshot(
+            self,
+            self.__class__.__name__,
+            cache=self.cache,
+            popularity=self.popularity,
+            voice=voice_pool,
+        )
+        self.add_cog(self.snapshots)
+        self.add_cog(
+            elo.ELO(
+                self,
+                self.__class__.__name__,
+                cache=self.cache,
+                popularity=self.popularity,
+                history=self.history,
+            )
+        )
+        self.add_cog(
+            taunt.Taunt(
+                self,
+                self.__class__.__name__,
+                space=self.__digital_ocean_space_name,
+                voice=voice_pool,
+                cache=self.cache,
+                admission=self.admission,
+            )
+        )
+        self.add_cog(
+            civs.Civs(
+                self,
+                self.__class__.__name__,
+                cache=self.cache,
+                workers=self.workers,
+                popularity=self.popularity,
+                history=self.history,
+            )
+        )
+        self.add_cog(
+            prefetch.Prefetch(
+                self,
+                self.__class__.__name__,
+                cache=self.cache,
+                popularity=self.popularity,
+                history=self.history,
+            )
+        )
+        self.add_cog(
+            history.History(self, self.__class__.__name__, history=self.history)
+        )
+        self.add_cog(meta.Meta(self, self.__class__.__name__, cache=self.cache))
         self.add_cog(error.CommandErrorHandler(self, self.__class__.__name__))
+        self.add_cog(admin.Admin(self, self.__class__.__name__))
 
     def run(self) -> None:
         super().run(self.__token)
 
+    async def close(self) -> None:
+        try:
+            self.snapshots.close()
+        except Exception:
+            self.log.exception("Failed to write snapshot")
+        await super().close()
+        self.workers.shutdown()
+        self.history.close()
+        self.cache.close()
+
     def __init__(self, debug: bool = False, **kwargs) -> None:
         super().__init__(**kwargs)
 
@@ -51,4 +151,17 @@ class AoE2Bot(commands.Bot):
             self.log.error(f"Invalid token in {space_env} env var!")
             sys.exit(1)
 
+        self.cache = SharedCache()
+        self.cache.attach_snapshot(
+            snapshot.Snapshot.snapshot_path(),
+            revalidate=snapshot.Snapshot.revalidated_namespaces,
+        )
+        self.workers = WorkerPool()
+        self.popularity = Popularity()
+        self.admission = Admission()
+        self.history = RatingHistory()
+
+        self.before_invoke(self.before_command)
+        self.after_invoke(self.after_command)
+
         self.add_cogs()
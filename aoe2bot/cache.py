@@ -0,0 +1,262 @@
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from typing import Any, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+
+class SharedCache:
+    """
+    A SQLite backed key/value cache shared by every bot process on the host.
+
+    Values are stored as zlib compressed blobs, grouped by namespace, with an optional expiry.
+
+    A snapshot of a previous run can be attached read-only. Keys missing from the cache are then served from the
+    snapshot. Expired ones are only served for namespaces that are revalidated, and are remembered until they are.
+    """
+
+    log: logging.Logger
+    _path: str
+    _conn: sqlite3.Connection
+    _lock: threading.Lock
+    _snapshot: Optional[sqlite3.Connection] = None
+    _snapshot_path: Optional[str] = None
+    _max_stale: float = 0.0
+    _revalidated: FrozenSet[str] = frozenset()
+    _stale: Set[Tuple[str, str]]
+
+    _path_env: str = "AOE2BOT_CACHE_PATH"
+    _default_path: str = os.path.join(tempfile.gettempdir(), "aoe2bot", "cache.sqlite3")
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """
+        Opens (and creates if needed) the cache database.
+
+        :param path: The database file, defaults to the `AOE2BOT_CACHE_PATH` env var or a file in the temp directory
+        """
+        self.log = logging.getLogger(f"{self.__class__.__name__}")
+
+        self._path = path or os.getenv(self._path_env) or self._default_path
+        os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._stale = set()
+        self._conn = sqlite3.connect(
+            self._path, timeout=10.0, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value BLOB NOT NULL,"
+            " expires REAL,"
+            " PRIMARY KEY (namespace, key)"
+            ") WITHOUT ROWID"
+        )
+
+        self.log.debug(f"Opened cache at {self._path}")
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        """
+        Fetches a value from the cache.
+
+        :param namespace: The namespace of the key
+        :param key: The key
+        :return: The value, or None if it is missing or expired
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires FROM cache WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            if row is None and self._snapshot is not None:
+                return self._get_snapshot(namespace, key)
+        if row is None:
+            return None
+
+        value, expires = row
+        if expires is not None and expires < time.time():
+            return None
+        return zlib.decompress(value)
+
+    def _get_snapshot(self, namespace: str, key: str) -> Optional[bytes]:
+        """
+        Fetches a value from the attached snapshot, marking it for revalidation if it has expired.
+
+        :param namespace: The namespace of the key
+        :param key: The key
+        :return: The value, or None if it is missing, or expired and not revalidated, or more than `max_stale` seconds
+            past its expiry
+        """
+        row = self._snapshot.execute(
+            "SELECT value, expires FROM cache WHERE namespace = ? AND key = ?",
+            (namespace, key),
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, expires = row
+        now: float = time.time()
+        if expires is not None and expires < now:
+            if namespace not in self._revalidated or expires + self._max_stale < now:
+                return None
+            self._stale.add((namespace, key))
+        return zlib.decompress(value)
+
+    def set(
+        self, namespace: str, key: str, value: bytes, ttl: Optional[float] = None
+    ) -> None:
+        """
+        Stores a value in the cache.
+
+        :param namespace: The namespace of the key
+        :param key: The key
+        :param value: The value
+        :param ttl: Seconds until the value expires, never expires if None
+        """
+        expires: Optional[float] = None if ttl is None else time.time() + ttl
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires) VALUES (?, ?, ?, ?)",
+                (namespace, key, zlib.compress(value), expires),
+            )
+
+    def get_json(self, namespace: str, key: str) -> Optional[Any]:
+        """
+        Fetches a JSON value from the cache.
+
+        :param namespace: The namespace of the key
+        :param key: The key
+        :return: The decoded value, or None if it is missing or expired
+        """
+        value: Optional[bytes] = self.get(namespace, key)
+        if value is None:
+            return None
+        return json.loads(value)
+
+    def set_json(
+        self, namespace: str, key: str, value: Any, ttl: Optional[float] = None
+    ) -> None:
+        """
+        Stores a JSON serializable value in the cache.
+
+        :param namespace: The namespace of the key
+        :param key: The key
+        :param value: The value
+        :param ttl: Seconds until the value expires, never expires if None
+        """
+        self.set(namespace, key, json.dumps(value, separators=(",", ":")).encode(), ttl)
+
+    def purge(self) -> int:
+        """
+        Removes all expired entries.
+
+        :return: The number of entries removed
+        """
+        with self._lock:
+            cursor: sqlite3.Cursor = self._conn.execute(
+                "DELETE FROM cache WHERE expires IS NOT NULL AND expires < ?",
+                (time.time(),),
+            )
+        return cursor.rowcount
+
+    def attach_snapshot(
+        self, path: str, max_stale: float = 604800.0, revalidate: Iterable[str] = ()
+    ) -> bool:
+        """
+        Attaches a snapshot to fall back on, it is memory mapped and read lazily.
+
+        :param path: The snapshot file
+        :param max_stale: Seconds past their expiry that snapshot entries are still served
+        :param revalidate: The namespaces whose expired entries are served and then revalidated with `pop_stale`
+        :return: Whether the snapshot exists and was attached
+        """
+        if not os.path.exists(path):
+            return False
+
+        snapshot: sqlite3.Connection = sqlite3.connect(
+            f"file:{path}?mode=ro", uri=True, check_same_thread=False
+        )
+        snapshot.execute("PRAGMA mmap_size=268435456")
+        with self._lock:
+            self._snapshot = snapshot
+            self._snapshot_path = path
+            self._max_stale = max_stale
+            self._revalidated = frozenset(revalidate)
+
+        self.log.debug(f"Attached snapshot {path}")
+        return True
+
+    def pop_stale(self, namespace: str, limit: int) -> List[str]:
+        """
+        Takes keys that were served stale from the snapshot, for revalidation.
+
+        :param namespace: The namespace of the keys
+        :param limit: The maximum number of keys to take
+        :return: The keys
+        """
+        keys: List[str] = []
+        with self._lock:
+            for stale in list(self._stale):
+                if len(keys) >= limit:
+                    break
+                if stale[0] == namespace:
+                    self._stale.discard(stale)
+                    keys.append(stale[1])
+        return keys
+
+    def snapshot(self, path: str, max_stale: float = 604800.0) -> None:
+        """
+        Writes a compacted copy of the cache to a file, replacing it atomically.
+
+        Entries of the attached snapshot and of the snapshot being replaced are carried over where the cache has
+        no newer copy, so entries only ever read from a snapshot survive any number of restarts.
+
+        :param path: The snapshot file
+        :param max_stale: Entries more than this many seconds past their expiry are left out
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path: str = f"{path}.{os.getpid()}.tmp"
+
+        # a separate connection reads the WAL database without holding up the cache
+        source: sqlite3.Connection = sqlite3.connect(self._path, timeout=10.0)
+        dest: sqlite3.Connection = sqlite3.connect(tmp_path, isolation_level=None)
+        try:
+            source.backup(dest)
+            for previous in {p for p in [self._snapshot_path, path] if p}:
+                if not os.path.exists(previous):
+                    continue
+                dest.execute("ATTACH DATABASE ? AS previous", (previous,))
+                try:
+                    dest.execute(
+                        "INSERT OR IGNORE INTO cache SELECT * FROM previous.cache"
+                    )
+                finally:
+                    dest.execute("DETACH DATABASE previous")
+            dest.execute(
+                "DELETE FROM cache WHERE expires IS NOT NULL AND expires < ?",
+                (time.time() - max_stale,),
+            )
+            dest.execute("PRAGMA journal_mode=DELETE")
+            dest.execute("VACUUM")
+        finally:
+            dest.close()
+            source.close()
+        os.replace(tmp_path, path)
+
+        self.log.debug(f"Wrote snapshot {path}")
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        with self._lock:
+            self._conn.close()
+            if self._snapshot is not None:
+                self._snapshot.close()
+                self._snapshot = None
@@ -0,0 +1,52 @@
+import logging
+from typing import Optional
+
+from discord.ext import commands  # type: ignore
+
+from aoe2bot import logs
+
+
+class Admin(commands.Cog):
+    """Bot owner commands."""
+
+    log: logging.Logger
+    _bot: commands.Bot
+
+    def __init__(self, bot: commands.Bot, bot_name: str) -> None:
+        """
+        Initialize the Admin cog.
+
+        :param bot: The bot the cog is attached to
+        :param bot_name: The name of the bot for logging purposes
+        """
+        self.log = logging.getLogger(f"{bot_name}.{self.__class__.__name__}")
+        self._bot = bot
+
+        self.log.info(f"Registered {self.__class__.__name__} cog to {bot_name}")
+
+    async def cog_check(self, ctx) -> bool:
+        return await self._bot.is_owner(ctx.author)
+
+    @commands.command()
+    async def loglevel(self, ctx, level: str, logger: Optional[str] = None) -> None:
+        """
+        Changes a log level at runtime. Owner only.
+
+        Usage: !loglevel <level> [logger]
+            - level:
+                DEBUG, INFO, WARNING or ERROR
+            - logger:
+                The logger to change (ex: AoE2net, AoE2Bot.Civs), defaults to all loggers
+
+        Examples:
+            Silence the API call debug records:
+                !loglevel INFO AoE2net
+        """
+        try:
+            logs.set_level(level, logger)
+        except ValueError as e:
+            await ctx.send(str(e))
+            return
+
+        self.log.info(f"Set {logger or 'root'} log level to {level.upper()}")
+        await ctx.send(f"Set `{logger or 'root'}` log level to *{level.upper()}*.")
@@ -1,9 +1,12 @@
 import enum
+import json
 import logging
 from typing import Dict, Optional, Any, Union, List
 
 import requests  # type: ignore
 
+from aoe2bot.cache import SharedCache
+
 
 class AoE2net:
     """https://aoe2.net/#api"""
@@ -20,23 +23,36 @@ class AoE2net:
     _base_url: str = "https://aoe2.net/api"
     _base_params: Dict[str, Any] = {"game": "aoe2de"}
     _strings: Optional[Dict[str, Any]] = None
+    _cache: Optional[SharedCache] = None
+    _cache_namespace: str = "aoe2net"
+    _cache_ttls: Dict[str, float] = {"strings": 86400.0}
+    _default_cache_ttl: float = 300.0
+    _refresh: bool = False
+    calls: int = 0
 
     def __init__(
         self,
         base_url: Optional[str] = None,
         base_params: Optional[Dict[str, Any]] = None,
+        cache: Optional[SharedCache] = None,
+        refresh: bool = False,
     ) -> None:
         """
         Initializes the API class.
 
         :param base_url: The base API url, defaults to `https://aoe2.net/api`
         :param base_params: The default parameters for all requests, defaults to `game=aoe2de`
+        :param cache: A cache for GET responses, shared with other processes
+        :param refresh: Always call the API and only write responses to the cache, for refreshing it
         """
         self.log: logging.Logger = logging.getLogger(f"{self.__class__.__name__}")
         if base_url is not None:
             self._base_url = base_url
         if base_params is not None:
             self._base_params = base_params
+        if cache is not None:
+            self._cache = cache
+        self._refresh = refresh
         self._strings = self.strings()
 
         self.log.debug(f"Initialized {self.__class__.__name__}")
@@ -61,14 +77,36 @@ class AoE2net:
             params.update(self._base_params)
         else:
             params = self._base_params
-        self.log.debug(f"Calling {url} with {params}")
+
+        cache_key: Optional[str] = None
+        if self._cache is not None and method == "GET":
+            cache_key = json.dumps([endpoint, params], sort_keys=True, default=str)
+            cached: Optional[Dict[str, Any]] = None
+            if not self._refresh:
+                cached = self._cache.get_json(self._cache_namespace, cache_key)
+            if cached is not None:
+                if self.log.isEnabledFor(logging.DEBUG):
+                    self.log.debug("Cache hit for %s with %s", url, params)
+                return cached
+
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug("Calling %s with %s", url, params)
+        self.calls += 1
 
         try:
             response: requests.Response = requests.request(
                 method=method, url=url, params=params
             )
             response.raise_for_status()
-            return response.json()
+            data: Dict[str, Any] = response.json()
+            if self._cache is not None and cache_key is not None:
+                self._cache.set_json(
+                    self._cache_namespace,
+                    cache_key,
+                    data,
+                    ttl=self._cache_ttls.get(endpoint, self._default_cache_ttl),
+                )
+            return data
         except requests.RequestException:
             self.log.exception(f"Failed API call")
             raise
@@ -146,7 +184,8 @@ class AoE2net:
             )
         :return: The list of players
         """
-        self.log.debug(f"Searching for {name}")
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug("Searching for %s", name)
         return self.leaderboard(board=board, name=name).get("leaderboard", [])
 
     def matches(
@@ -207,3 +246,16 @@ class AoE2net:
                     s = lookups["string"]
                     break
         return s
+
+    def lookup_table(self, key: str) -> Dict[int, str]:
+        """
+        Returns all the strings for a key as an id to string lookup.
+
+        :param key: The strings key (ex: civ, leaderboard)
+        :return: A dictionary of id to string
+        """
+        table: Dict[int, str] = {}
+        if self._strings:
+            for lookups in self._strings.get(key, []):
+                table[lookups["id"]] = lookups["string"]
+        return table
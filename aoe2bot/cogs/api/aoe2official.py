@@ -1,6 +1,8 @@
+import concurrent.futures
 import enum
+import itertools
 import logging
-from typing import Dict, Optional, Any, Union, List
+from typing import Dict, Optional, Any, List, Tuple
 
 import requests  # type: ignore
 
@@ -18,14 +20,8 @@ class AoE2official:
         THREE_V_THREE = "3v3"
         FOUR_V_FOUR = "4v4"
 
-    _base_url: str = "https://api.ageofempires.com/api/v2/AgeII/GetGlobalStats"
-
-    payload = {
-        "isRanked": True,
-        "gameMode": "Random Map",
-        "matchSize": "1v1",
-        "mapSize": "Large",
-    }
+    _base_url: str = "https://api.ageofempires.com/api/v2/AgeII"
+    _base_params: Dict[str, Any] = {"isRanked": True, "mapSize": "Large"}
 
     def __init__(
         self,
@@ -35,8 +31,8 @@ class AoE2official:
         """
         Initializes the API class.
 
-        :param base_url: The base API url, defaults to `https://aoe2.net/api`
-        :param base_params: The default parameters for all requests, defaults to `game=aoe2de`
+        :param base_url: The base API url, defaults to `https://api.ageofempires.com/api/v2/AgeII`
+        :param base_params: The default parameters for all requests, defaults to `isRanked=True, mapSize=Large`
         """
         self.log: logging.Logger = logging.getLogger(f"{self.__class__.__name__}")
         if base_url is not None:
@@ -50,27 +46,26 @@ class AoE2official:
         self,
         endpoint: str,
         method: str = "POST",
-        params: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         A helper function to make API requests.
 
         :param endpoint: The endpoint to call
         :param method: The HTTP method to be used
-        :param params: The parameters to be used
+        :param params: The parameters to be used, sent as the JSON body
         :raises: Raises an error on any HTTP request failure
         :return: A dictionary of the JSON API response
         """
         url = f"{self._base_url}/{endpoint}"
+        payload: Dict[str, Any] = dict(self._base_params)
         if params:
-            params.update(self._base_params)
-        else:
-            params = self._base_params
-        self.log.debug(f"Calling {url} with {params}")
+            payload.update(params)
+        self.log.debug(f"Calling {url} with {payload}")
 
         try:
             response: requests.Response = requests.request(
-                method=method, url=url, params=params
+                method=method, url=url, json=payload, timeout=30
             )
             response.raise_for_status()
             return response.json()
@@ -78,5 +73,94 @@ class AoE2official:
             self.log.exception(f"Failed API call")
             raise
 
-    def global_stats(self):
-        self.call_api("GetGlobalStats", params)
+    def global_stats(
+        self,
+        game_mode: GameMode = GameMode.RANDOM_MAP,
+        match_size: MatchSize = MatchSize.ONE_V_ONE,
+    ) -> Dict[str, Any]:
+        """
+        Request the global civ stats for a game mode and match size.
+
+        :param game_mode: The game mode
+        :param match_size: The match size
+        :return: A dictionary of the stats
+        """
+        params: Dict[str, Any] = {
+            "gameMode": game_mode.value,
+            "matchSize": match_size.value,
+        }
+        self.log.debug(
+            f"Fetching global stats for {game_mode.value} {match_size.value}"
+        )
+        return self.call_api("GetGlobalStats", params=params)
+
+    @staticmethod
+    def _first(entry: Dict[str, Any], *keys: str) -> Any:
+        for key in keys:
+            if entry.get(key) is not None:
+                return entry[key]
+        return None
+
+    def civ_rates(self, stats: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Normalizes a global stats response to civ win and play rates, best win rate first.
+
+        :param stats: A global stats response
+        :return: A list of civ, win_rate and play_rate dictionaries, empty if the response is not an object
+        """
+        entries: List[Dict[str, Any]] = []
+        if not isinstance(stats, dict):
+            self.log.warning(f"Unexpected global stats response {type(stats).__name__}")
+            return []
+        for value in stats.values():
+            if isinstance(value, list) and value and isinstance(value[0], dict):
+                entries = value
+                break
+
+        rates: List[Dict[str, Any]] = []
+        for entry in entries:
+            civ: Optional[str] = self._first(entry, "civName", "civilization", "name")
+            win_rate: Any = self._first(entry, "winRate", "winPercentage")
+            play_rate: Any = self._first(
+                entry, "playRate", "pickRate", "playPercentage"
+            )
+            if civ is None or win_rate is None:
+                continue
+            rates.append(
+                {
+                    "civ": civ,
+                    "win_rate": float(win_rate),
+                    "play_rate": float(play_rate or 0.0),
+                }
+            )
+        rates.sort(key=lambda r: r["win_rate"], reverse=True)
+        return rates
+
+    def meta_table(self) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """
+        Fetches every game mode and match size combination concurrently and normalizes them.
+
+        Combinations that fail to fetch are left out.
+
+        :return: The civ rates keyed by game mode then match size
+        """
+        combinations: List[Tuple[AoE2official.GameMode, AoE2official.MatchSize]] = list(
+            itertools.product(self.GameMode, self.MatchSize)
+        )
+        table: Dict[str, Dict[str, List[Dict[str, Any]]]] = {
+            mode.value: {} for mode in self.GameMode
+        }
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(combinations)
+        ) as executor:
+            futures = {
+                executor.submit(self.global_stats, mode, size): (mode, size)
+                for mode, size in combinations
+            }
+            for future in concurrent.futures.as_completed(futures):
+                mode, size = futures[future]
+                try:
+                    table[mode.value][size.value] = self.civ_rates(future.result())
+                except (requests.RequestException, ValueError):
+                    continue
+        return table
@@ -1,30 +1,52 @@
-from collections import defaultdict
-import csv
+import asyncio
 import datetime
 import logging
 import io
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import discord  # type: ignore
 from discord.ext import commands  # type: ignore
 
+from aoe2bot.cache import SharedCache
 from aoe2bot.cogs.api import aoe2net
+from aoe2bot.history import RatingHistory
+from aoe2bot.popularity import Popularity, lookup_key
+from aoe2bot.reports import CivResult, build_civs_report
+from aoe2bot.workers import WorkerPool
 
 
 class Civs(commands.Cog):
     """Fetches match history for a list of players"""
 
-    def __init__(self, bot: commands.Bot, bot_name: str) -> None:
+    def __init__(
+        self,
+        bot: commands.Bot,
+        bot_name: str,
+        cache: Optional[SharedCache] = None,
+        workers: Optional[WorkerPool] = None,
+        compress_threshold: Optional[int] = 1 << 20,
+        popularity: Optional[Popularity] = None,
+        history: Optional[RatingHistory] = None,
+    ) -> None:
         """
         Initialize the Civs cog.
 
         :param bot: The bot the cog is attached to
         :param bot_name: The name of the bot for logging purposes
+        :param cache: A cache for API responses, shared with other processes
+        :param workers: A process pool to build reports in, reports are built inline if None
+        :param compress_threshold: Gzip reports larger than this many bytes, never if None
+        :param popularity: A tracker to record lookups in, for prefetching
+        :param history: A rating history to record looked up ratings in
         """
         self.log = logging.getLogger(f"{bot_name}.{self.__class__.__name__}")
 
         self._bot = bot
-        self._aoe2_api = aoe2net.AoE2net()
+        self._aoe2_api = aoe2net.AoE2net(cache=cache)
+        self._workers = workers
+        self._compress_threshold = compress_threshold
+        self._popularity = popularity
+        self._history = history
 
         self.log.info(f"Registered {self.__class__.__name__} cog to {bot_name}")
 
@@ -45,21 +67,27 @@ class Civs(commands.Cog):
         """
         players: List[str] = [p.strip() for p in names.split(",")]
 
-        def defaultciv() -> Any:
-            return {"wins": 0, "losses": 0, "total": 0, "custom": 0}
-
-        player_stats: List[Dict[str, Any]] = []
+        player_results: List[Tuple[str, List[CivResult]]] = []
         for name in players:
             player: List[Dict[str, Any]] = self._aoe2_api.find_name(name)
+            if self._history is not None:
+                # writes to the history can wait on other processes, so they are kept off the event loop
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._history.record_players, player
+                )
             if not player:
                 await ctx.send(f"Could not find any results for '{name}'.")
                 continue
+            if self._popularity is not None:
+                self._popularity.record(
+                    lookup_key("civs", player[0]["profile_id"], name)
+                )
             profile_id: Union[str, int] = player[0]["profile_id"]
 
             matches: List[Dict[str, Any]] = self._aoe2_api.matches(
                 profile_ids=profile_id
             )
-            stats: Dict[str, Any] = {"name": name, "stats": defaultdict(defaultciv)}
+            results: List[CivResult] = []
             for match in matches:
                 # don't count unranked games
                 if match["game_type"] == self._aoe2_api.LeaderboardID:
@@ -67,40 +95,27 @@ class Civs(commands.Cog):
 
                 for match_player in match["players"]:
                     if match_player["profile_id"] == profile_id:
-                        civ = self._aoe2_api.lookup_string("civ", match_player["civ"])
-                        if not civ:
-                            break
-                        stats["stats"][civ]["total"] += 1
-                        win = match_player["won"]
-                        if win is None:
-                            stats["stats"][civ]["custom"] += 1
-                        elif win:
-                            stats["stats"][civ]["wins"] += 1
-                        else:
-                            stats["stats"][civ]["losses"] += 1
-
-                        stats["type"] = match["game_type"]
-
-            player_stats.append(stats)
-
-        if not player_stats:
+                        results.append((match_player["civ"], match_player["won"]))
+                        break
+
+            player_results.append((name, results))
+
+        if not player_results:
             await ctx.send(f"No stats found.")
             return
 
-        data: io.StringIO = io.StringIO()
-        writer: csv.DictWriter = csv.DictWriter(
-            data, ["player", "civ", "wins", "losses", "custom", "total", "mode"]
+        args: Tuple[Any, ...] = (
+            player_results,
+            self._aoe2_api.lookup_table("civ"),
+            self._compress_threshold,
         )
-        writer.writeheader()
-        for ps in player_stats:
-            for c, s in ps["stats"].items():
-                row: Dict[str, Any] = {"player": ps["name"]}
-                row.update({"civ": c})
-                row.update(s)
-                writer.writerow(row)
-        data.seek(0)
+        report: bytes
+        compressed: bool
+        if self._workers is not None:
+            report, compressed = await self._workers.run(build_civs_report, *args)
+        else:
+            report, compressed = build_civs_report(*args)
 
         date: str = datetime.datetime.now().date().strftime("%Y%m%d_")
-        await ctx.send(
-            file=discord.File(data, filename=date + "_".join(players) + ".csv")
-        )
+        filename: str = date + "_".join(players) + (".csv.gz" if compressed else ".csv")
+        await ctx.send(file=discord.File(io.BytesIO(report), filename=filename))
@@ -1,9 +1,13 @@
+import asyncio
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from discord.ext import commands  # type: ignore
 
+from aoe2bot.cache import SharedCache
 from aoe2bot.cogs.api import aoe2net
+from aoe2bot.history import RatingHistory
+from aoe2bot.popularity import Popularity, lookup_key
 
 
 class ELO(commands.Cog):
@@ -12,18 +16,32 @@ class ELO(commands.Cog):
     log: logging.Logger
     _bot: commands.Bot
     _aoe2_api: aoe2net.AoE2net
-
-    def __init__(self, bot: commands.Bot, bot_name: str) -> None:
+    _popularity: Optional[Popularity] = None
+    _history: Optional[RatingHistory] = None
+
+    def __init__(
+        self,
+        bot: commands.Bot,
+        bot_name: str,
+        cache: Optional[SharedCache] = None,
+        popularity: Optional[Popularity] = None,
+        history: Optional[RatingHistory] = None,
+    ) -> None:
         """
         Initialize the ELO cog.
 
         :param bot: The bot the cog is attached to
         :param bot_name: The name of the bot for logging purposes
+        :param cache: A cache for API responses, shared with other processes
+        :param popularity: A tracker to record lookups in, for prefetching
+        :param history: A rating history to record looked up ratings in
         """
         self.log = logging.getLogger(f"{bot_name}.{self.__class__.__name__}")
 
         self._bot = bot
-        self._aoe2_api = aoe2net.AoE2net()
+        self._aoe2_api = aoe2net.AoE2net(cache=cache)
+        self._popularity = popularity
+        self._history = history
 
         self.log.info(f"Registered {self.__class__.__name__} cog to {bot_name}")
 
@@ -49,10 +67,17 @@ class ELO(commands.Cog):
             Get ELO for a player with a space in the name:
                 !elo "[aM] Liereyy"
         """
-        self.log.info(f"Looking up player {name}")
+        self.log.info("Looking up player %s", name)
 
         results: List[str] = [f"Ratings for `{name}`:"]
         boards: List[Dict[str, Any]] = self._aoe2_api.find_name(name)
+        if self._history is not None:
+            # writes to the history can wait on other processes, so they are kept off the event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._history.record_players, boards
+            )
+        if self._popularity is not None and boards:
+            self._popularity.record(lookup_key("elo", boards[0]["profile_id"], name))
         for board in boards:
             try:
                 board_str = self._aoe2_api.lookup_string(
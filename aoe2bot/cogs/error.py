@@ -2,6 +2,8 @@ import logging
 
 from discord.ext import commands  # type: ignore
 
+from aoe2bot.admission import Overloaded, RateLimited
+
 
 class CommandErrorHandler(commands.Cog):
     log: logging.Logger
@@ -31,6 +33,10 @@ class CommandErrorHandler(commands.Cog):
             text = f"Invalid use of {ctx.command}, see !help."
         elif isinstance(error, commands.CommandNotFound):
             text = f"Command does not exist."
+        elif isinstance(error, RateLimited):
+            text = f"Slow down, this {error.scope} is out of command budget. Try again in {error.retry_after:.0f}s."
+        elif isinstance(error, Overloaded):
+            text = f"The bot is busy with {error.command_class} commands, try again shortly."
         else:
             self.log.exception("Unhandled exception occurred")
 
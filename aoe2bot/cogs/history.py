@@ -0,0 +1,116 @@
+import logging
+import time
+from typing import Dict, List, Optional
+
+from discord.ext import commands  # type: ignore
+
+from aoe2bot.cogs.api import aoe2net
+from aoe2bot.history import DAY, Point, RatingHistory
+
+
+class History(commands.Cog):
+    """Shows a player's rating history from the local rating store."""
+
+    log: logging.Logger
+    _bot: commands.Bot
+    _history: RatingHistory
+
+    _boards: Dict[str, aoe2net.AoE2net.LeaderboardID] = {
+        "unranked": aoe2net.AoE2net.LeaderboardID.UNRANKED,
+        "dm": aoe2net.AoE2net.LeaderboardID.DEATHMATCH,
+        "tdm": aoe2net.AoE2net.LeaderboardID.TEAM_DEATHMATCH,
+        "rm": aoe2net.AoE2net.LeaderboardID.RANDOM_MAP,
+        "trm": aoe2net.AoE2net.LeaderboardID.TEAM_RANDOM_MAP,
+        "ew": aoe2net.AoE2net.LeaderboardID.EMPIRE_WARS,
+        "tew": aoe2net.AoE2net.LeaderboardID.TEAM_EMPIRE_WARS,
+    }
+    _sparks: str = "▁▂▃▄▅▆▇█"
+    _spark_width: int = 40
+
+    def __init__(
+        self, bot: commands.Bot, bot_name: str, history: RatingHistory
+    ) -> None:
+        """
+        Initialize the History cog.
+
+        :param bot: The bot the cog is attached to
+        :param bot_name: The name of the bot for logging purposes
+        :param history: The rating history to answer from
+        """
+        self.log = logging.getLogger(f"{bot_name}.{self.__class__.__name__}")
+
+        self._bot = bot
+        self._history = history
+
+        self.log.info(f"Registered {self.__class__.__name__} cog to {bot_name}")
+
+    def sparkline(self, points: List[Point]) -> str:
+        """
+        Draws the ratings as a line of block characters.
+
+        :param points: The history points
+        :return: The sparkline
+        """
+        step: int = max(1, -(-len(points) // self._spark_width))
+        lasts: List[int] = [points[i][3] for i in range(0, len(points), step)]
+        lasts[-1] = points[-1][3]
+        low: int = min(lasts)
+        spread: int = max(lasts) - low or 1
+        return "".join(
+            self._sparks[(last - low) * (len(self._sparks) - 1) // spread]
+            for last in lasts
+        )
+
+    @commands.command()
+    async def history(self, ctx, name: str, board: str = "rm", days: int = 90) -> None:
+        """
+        Shows a player's rating history. Player names with spaces must be in quotes.
+
+        Only ratings the bot has seen through !elo, !civs or its background refreshes are known.
+
+        Usage: !history <player_name> [board] [days]
+            - player_name:
+                The player's username
+            - board:
+                rm, trm, ew, tew, dm, tdm or unranked, defaults to rm
+            - days:
+                How far back to go, defaults to 90
+
+        Examples:
+            Get the last 90 days of 1v1 Random Map ratings for `GL.TheViper`:
+                !history GL.TheViper
+
+            Get the last year of Team Random Map ratings for `GL.TheViper`:
+                !history GL.TheViper trm 365
+        """
+        leaderboard: Optional[aoe2net.AoE2net.LeaderboardID] = self._boards.get(
+            board.lower()
+        )
+        if leaderboard is None:
+            await ctx.send(
+                f"Unknown board `{board}`, use one of: {', '.join(self._boards)}."
+            )
+            return
+
+        profile_id: Optional[int] = self._history.profile_id(name)
+        if profile_id is None:
+            await ctx.send(f"No rating history for `{name}`, try !elo first.")
+            return
+
+        start: int = int(time.time()) - max(days, 1) * DAY
+        resolution: str
+        points: List[Point]
+        resolution, points = self._history.query(profile_id, leaderboard.value, start)
+        if not points:
+            await ctx.send(
+                f"No {board} rating history for `{name}` in the last {days} days."
+            )
+            return
+
+        results: List[str] = [
+            f"Rating history for `{name}` ({board}, last {days} days, {resolution}):",
+            f"- Now: *{points[-1][3]}*, was {points[0][3]}",
+            f"- Range: {min(p[1] for p in points)} to {max(p[2] for p in points)}",
+            f"`{self.sparkline(points)}`",
+        ]
+        await ctx.send("\n".join(results))
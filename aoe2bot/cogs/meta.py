@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from discord.ext import commands, tasks  # type: ignore
+
+from aoe2bot.cache import SharedCache
+from aoe2bot.cogs.api import aoe2official
+
+
+class Meta(commands.Cog):
+    """Shows the current civ meta from the official global stats."""
+
+    log: logging.Logger
+    _bot: commands.Bot
+    _official_api: aoe2official.AoE2official
+    _cache: Optional[SharedCache] = None
+    _cache_namespace: str = "aoe2official"
+    _cache_key: str = "meta"
+    _table: Dict[str, Dict[str, List[Dict[str, Any]]]]
+
+    _modes: Dict[str, aoe2official.AoE2official.GameMode] = {
+        "rm": aoe2official.AoE2official.GameMode.RANDOM_MAP,
+        "ew": aoe2official.AoE2official.GameMode.EMPIRE_WARS,
+    }
+
+    def __init__(
+        self,
+        bot: commands.Bot,
+        bot_name: str,
+        cache: Optional[SharedCache] = None,
+        refresh_hours: float = 6.0,
+    ) -> None:
+        """
+        Initialize the Meta cog.
+
+        :param bot: The bot the cog is attached to
+        :param bot_name: The name of the bot for logging purposes
+        :param cache: A cache to keep the meta table in, shared with other processes
+        :param refresh_hours: Hours between refreshes of the meta table
+        """
+        self.log = logging.getLogger(f"{bot_name}.{self.__class__.__name__}")
+
+        self._bot = bot
+        self._official_api = aoe2official.AoE2official()
+        self._cache = cache
+
+        self._table = {}
+        if self._cache is not None:
+            self._table = (
+                self._cache.get_json(self._cache_namespace, self._cache_key) or {}
+            )
+
+        self._refresh.change_interval(hours=refresh_hours)
+        self._refresh.start()
+
+        self.log.info(f"Registered {self.__class__.__name__} cog to {bot_name}")
+
+    def cog_unload(self) -> None:
+        self._refresh.cancel()
+
+    @tasks.loop(hours=6)
+    async def _refresh(self) -> None:
+        """Rebuilds the meta table in a thread, keeping the old table if every request fails."""
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        try:
+            table: Dict[str, Dict[str, List[Dict[str, Any]]]] = (
+                await loop.run_in_executor(None, self._official_api.meta_table)
+            )
+        except Exception:
+            # an exception escaping a task loop stops it for good
+            self.log.exception("Failed to refresh the meta table")
+            return
+        if not any(table.values()):
+            self.log.warning("Failed to refresh the meta table")
+            return
+
+        self._table = table
+        if self._cache is not None:
+            self._cache.set_json(self._cache_namespace, self._cache_key, table)
+        self.log.debug("Refreshed the meta table")
+
+    @commands.command()
+    async def meta(self, ctx, size: str = "1v1", mode: str = "rm") -> None:
+        """
+        Shows the civs with the best win rates.
+
+        Usage: !meta [size] [mode]
+            - size:
+                1v1, 2v2, 3v3 or 4v4
+            - mode:
+                rm (Random Map) or ew (Empire Wars)
+
+        Examples:
+            Get the 1v1 Random Map meta:
+                !meta
+
+            Get the 4v4 Empire Wars meta:
+                !meta 4v4 ew
+        """
+        game_mode: Optional[aoe2official.AoE2official.GameMode] = self._modes.get(
+            mode.lower()
+        )
+        if game_mode is None:
+            await ctx.send(
+                f"Unknown mode `{mode}`, use one of: {', '.join(self._modes)}."
+            )
+            return
+
+        rates: List[Dict[str, Any]] = self._table.get(game_mode.value, {}).get(
+            size.lower(), []
+        )
+        if not rates:
+            await ctx.send(f"No stats available for {game_mode.value} {size} yet.")
+            return
+
+        results: List[str] = [f"Top civs for {game_mode.value} {size.lower()}:"]
+        for rate in rates[:10]:
+            results.append(
+                f"- {rate['civ']}: *{rate['win_rate']:.1f}%* wins, {rate['play_rate']:.1f}% played"
+            )
+        await ctx.send("\n".join(results))
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import requests  # type: ignore
+from discord.ext import commands, tasks  # type: ignore
+
+from aoe2bot.cache import SharedCache
+from aoe2bot.cogs.api import aoe2net
+from aoe2bot.history import RatingHistory
+from aoe2bot.popularity import Popularity, parse_lookup_key
+
+
+class Prefetch(commands.Cog):
+    """Refreshes the most popular player lookups ahead of demand."""
+
+    log: logging.Logger
+    _bot: commands.Bot
+    _aoe2_api: aoe2net.AoE2net
+    _popularity: Popularity
+    _top: int
+    _budget: int
+    _history: Optional[RatingHistory] = None
+
+    def __init__(
+        self,
+        bot: commands.Bot,
+        bot_name: str,
+        cache: SharedCache,
+        popularity: Popularity,
+        top: int = 12,
+        budget: int = 100,
+        interval: float = 240.0,
+        history: Optional[RatingHistory] = None,
+    ) -> None:
+        """
+        Initialize the Prefetch cog.
+
+        The interval should be shorter than the API response cache TTL, so popular entries never expire. A lookup
+        costs up to 8 requests to refresh, so the budget should cover 8 times `top` for every entry to be refreshed.
+
+        :param bot: The bot the cog is attached to
+        :param bot_name: The name of the bot for logging purposes
+        :param cache: The API response cache to keep warm
+        :param popularity: The lookup popularity tracker
+        :param top: The number of most popular lookups to refresh
+        :param budget: The maximum number of upstream requests per refresh
+        :param interval: Seconds between refreshes
+        :param history: A rating history to record refreshed ratings in
+        """
+        self.log = logging.getLogger(f"{bot_name}.{self.__class__.__name__}")
+
+        self._bot = bot
+        self._aoe2_api = aoe2net.AoE2net(cache=cache, refresh=True)
+        self._popularity = popularity
+        self._top = top
+        self._budget = budget
+        self._history = history
+
+        self._refresh.change_interval(seconds=interval)
+        self._refresh.start()
+
+        self.log.info(f"Registered {self.__class__.__name__} cog to {bot_name}")
+
+    def cog_unload(self) -> None:
+        self._refresh.cancel()
+
+    def _cost(self, names: Set[str], kinds: Set[str]) -> int:
+        """
+        The number of upstream requests needed to refresh a player.
+
+        :param names: The names the player was searched for by
+        :param kinds: The lookup kinds to refresh, elo and/or civs
+        :return: The number of requests
+        """
+        cost: int = len(self._aoe2_api.LeaderboardID) * len(names)
+        if "civs" in kinds:
+            cost += 1
+        return cost
+
+    def refresh(self, keys: List[str]) -> int:
+        """
+        Refreshes the cached API responses for lookups, most popular first, until the budget runs out.
+
+        Lookups are grouped by player, so the matches of a player popular for both elo and civs are only fetched
+        once, and each spelling the player was searched by is only refreshed once.
+
+        :param keys: The popularity keys, as returned by `lookup_key`
+        :return: The number of upstream requests made
+        """
+        players: Dict[str, Tuple[Set[str], Set[str]]] = {}
+        for key in keys:
+            kind, profile_id, name = parse_lookup_key(key)
+            names, kinds = players.setdefault(profile_id, (set(), set()))
+            names.add(name)
+            kinds.add(kind)
+
+        start_calls: int = self._aoe2_api.calls
+        for profile_id, (names, kinds) in players.items():
+            spent: int = self._aoe2_api.calls - start_calls
+            if spent + self._cost(names, kinds) > self._budget:
+                break
+
+            try:
+                for name in sorted(names):
+                    player: List[Dict[str, Any]] = self._aoe2_api.find_name(name)
+                    if self._history is not None:
+                        self._history.record_players(player)
+                if "civs" in kinds:
+                    self._aoe2_api.matches(profile_ids=int(profile_id))
+            except requests.RequestException:
+                self.log.warning(f"Failed to refresh player {profile_id}")
+        return self._aoe2_api.calls - start_calls
+
+    @tasks.loop(seconds=240)
+    async def _refresh(self) -> None:
+        top: List[Tuple[str, float]] = self._popularity.top(self._top)
+        if not top:
+            return
+
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        calls: int = await loop.run_in_executor(
+            None, self.refresh, [key for key, _ in top]
+        )
+        self.log.debug(f"Refreshed popular lookups with {calls} requests")
+
+    @_refresh.before_loop
+    async def _before_refresh(self) -> None:
+        await self._bot.wait_until_ready()
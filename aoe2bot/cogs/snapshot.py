@@ -0,0 +1,183 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Dict, List, Optional, Set
+
+import requests  # type: ignore
+from discord.ext import commands, tasks  # type: ignore
+
+from aoe2bot.cache import SharedCache
+from aoe2bot.cogs.api import aoe2net
+from aoe2bot.cogs.voice import VoicePool
+from aoe2bot.popularity import Popularity
+
+
+class Snapshot(commands.Cog):
+    """Periodically snapshots the caches to disk, so restarts come up warm."""
+
+    log: logging.Logger
+    _bot: commands.Bot
+    _cache: SharedCache
+    _path: str
+    _popularity: Popularity
+    _voice: VoicePool
+    _aoe2_api: Optional[aoe2net.AoE2net] = None
+    _revalidate_limit: int
+    _state_namespace: str = "state"
+    _save_lock: threading.Lock
+    # the namespaces whose stale snapshot entries `revalidate` knows how to re-fetch
+    revalidated_namespaces: Set[str] = {aoe2net.AoE2net._cache_namespace}
+
+    _path_env: str = "AOE2BOT_SNAPSHOT_PATH"
+    _default_path: str = os.path.join(
+        tempfile.gettempdir(), "aoe2bot", "snapshot.sqlite3"
+    )
+
+    def __init__(
+        self,
+        bot: commands.Bot,
+        bot_name: str,
+        cache: SharedCache,
+        popularity: Popularity,
+        voice: VoicePool,
+        path: Optional[str] = None,
+        interval: float = 600.0,
+        revalidate_limit: int = 20,
+    ) -> None:
+        """
+        Initialize the Snapshot cog and restore the state saved in the cache's snapshot.
+
+        The snapshot should already be attached to the cache, see `snapshot_path`.
+
+        :param bot: The bot the cog is attached to
+        :param bot_name: The name of the bot for logging purposes
+        :param cache: The cache to snapshot
+        :param popularity: The lookup popularity tracker to save and restore
+        :param voice: The voice pool whose taunt activity is saved and restored
+        :param path: The snapshot file, see `snapshot_path`
+        :param interval: Seconds between snapshots
+        :param revalidate_limit: The maximum number of stale API responses revalidated every 10 seconds
+        """
+        self.log = logging.getLogger(f"{bot_name}.{self.__class__.__name__}")
+
+        self._bot = bot
+        self._cache = cache
+        self._path = path or self.snapshot_path()
+        self._popularity = popularity
+        self._voice = voice
+        self._revalidate_limit = revalidate_limit
+        self._save_lock = threading.Lock()
+
+        self.restore()
+
+        self._save.change_interval(seconds=interval)
+        self._save.start()
+        self._revalidate.start()
+
+        self.log.info(f"Registered {self.__class__.__name__} cog to {bot_name}")
+
+    @classmethod
+    def snapshot_path(cls) -> str:
+        """
+        The snapshot file, from the `AOE2BOT_SNAPSHOT_PATH` env var or a file in the temp directory.
+
+        :return: The path
+        """
+        return os.getenv(cls._path_env) or cls._default_path
+
+    def cog_unload(self) -> None:
+        self._save.cancel()
+        self._revalidate.cancel()
+
+    @property
+    def _state_suffix(self) -> str:
+        # each worker process keeps its own state, keyed by the shards it owns
+        shard_ids: Optional[List[int]] = getattr(self._bot, "shard_ids", None)
+        return ",".join(str(s) for s in shard_ids) if shard_ids else "all"
+
+    def restore(self) -> None:
+        """Restores the popularity scores and taunt activity from the cache."""
+        popularity: Optional[Dict[str, List[float]]] = self._cache.get_json(
+            self._state_namespace, f"popularity:{self._state_suffix}"
+        )
+        if popularity:
+            self._popularity.load(popularity)
+
+        activity: Optional[Dict[str, Dict[str, float]]] = self._cache.get_json(
+            self._state_namespace, f"voice:{self._state_suffix}"
+        )
+        if activity:
+            self._voice.load_activity(activity)
+
+    def save(self) -> None:
+        """
+        Saves the popularity scores and taunt activity to the cache, and snapshots it to disk.
+
+        Saves are serialized, a save started while another is running waits for it to finish.
+        """
+        with self._save_lock:
+            self._save_state()
+
+    def _save_state(self) -> None:
+        self._cache.set_json(
+            self._state_namespace,
+            f"popularity:{self._state_suffix}",
+            self._popularity.dump(),
+        )
+        self._cache.set_json(
+            self._state_namespace,
+            f"voice:{self._state_suffix}",
+            self._voice.dump_activity(),
+        )
+        self._cache.snapshot(self._path)
+
+    def close(self) -> None:
+        """Stops the periodic saves and revalidation, and writes a final snapshot."""
+        self.cog_unload()
+        self.save()
+
+    @tasks.loop(seconds=600)
+    async def _save(self) -> None:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.save)
+
+    @_save.before_loop
+    async def _before_save(self) -> None:
+        await self._bot.wait_until_ready()
+
+    def revalidate(self) -> int:
+        """
+        Re-fetches API responses that were served stale from the snapshot.
+
+        :return: The number of responses revalidated
+        """
+        keys: List[str] = self._cache.pop_stale(
+            aoe2net.AoE2net._cache_namespace, self._revalidate_limit
+        )
+        if not keys:
+            return 0
+
+        if self._aoe2_api is None:
+            self._aoe2_api = aoe2net.AoE2net(cache=self._cache, refresh=True)
+
+        for key in keys:
+            endpoint, params = json.loads(key)
+            try:
+                self._aoe2_api.call_api(endpoint, params=params)
+            except requests.RequestException:
+                self.log.warning(f"Failed to revalidate {endpoint} with {params}")
+        return len(keys)
+
+    @tasks.loop(seconds=10)
+    async def _revalidate(self) -> None:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        count: int = await loop.run_in_executor(None, self.revalidate)
+        if count:
+            self.log.debug(f"Revalidated {count} stale API responses")
+
+    @_revalidate.before_loop
+    async def _before_revalidate(self) -> None:
+        await self._bot.wait_until_ready()
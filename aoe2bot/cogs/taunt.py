@@ -1,17 +1,22 @@
 import asyncio
+import collections
 import io
 import json
 import logging
 import shlex
 import subprocess
 import sys
-from typing import Any, Dict, List, Optional, Tuple
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import discord  # type: ignore
 from discord.ext import commands  # type: ignore
 from discord.opus import Encoder  # type: ignore
 
+from aoe2bot.admission import Admission, RateLimited
+from aoe2bot.cache import SharedCache
 from aoe2bot.cogs.api.digitalocean import DigitalOcean
+from aoe2bot.cogs.voice import VoicePool
 
 
 class FFmpegPCMAudio(discord.AudioSource):
@@ -55,6 +60,9 @@ class FFmpegPCMAudio(discord.AudioSource):
             return b""
         return ret
 
+    def pcm(self) -> bytes:
+        return self._stdout.getvalue()
+
     def cleanup(self):
         proc = self._process
         if proc is None:
@@ -72,15 +80,24 @@ class Taunt(commands.Cog):
     _space: str
     _manifest_name: str = "manifest.json"
     _do_api: DigitalOcean
+    _voice: VoicePool
+    _cache: Optional[SharedCache] = None
+    _cache_namespace: str = "taunt"
+    _cache_ttl: float = 86400.0
+    _admission: Optional[Admission] = None
     _manifest: List[Dict[str, Any]]
-    loop: bool = False
+    # the message ids of the looping taunts of each guild
+    _loops: Dict[int, Set[int]]
 
     def __init__(
         self,
         bot: commands.Bot,
         bot_name: str,
         space: Optional[str],
+        voice: VoicePool,
         manifest: str = "manifest.json",
+        cache: Optional[SharedCache] = None,
+        admission: Optional[Admission] = None,
     ) -> None:
         """
         Initialize the Taunt cog.
@@ -88,7 +105,10 @@ class Taunt(commands.Cog):
         :param bot: The bot the cog is attached to
         :param bot_name: The name of the bot for logging purposes
         :param space: The name of the space/bucket to use
+        :param voice: The voice connection pool to play taunts through
         :param manifest: The name of the manifest file to use
+        :param cache: A cache for the manifest and decoded taunts, shared with other processes
+        :param admission: Admission control to charge every repeat of a looping taunt to
         """
         self.log = logging.getLogger(f"{bot_name}.{self.__class__.__name__}")
 
@@ -97,9 +117,13 @@ class Taunt(commands.Cog):
         self._space = space
 
         self._bot = bot
+        self._voice = voice
+        self._cache = cache
+        self._admission = admission
+        self._loops = collections.defaultdict(set)
 
         self._do_api = DigitalOcean()
-        self._manifest = json.load(self._do_api.get_object(self._space, manifest))
+        self._manifest = self.get_manifest(manifest)
         self._taunt_min, self._taunt_max = self.get_taunt_range()
 
         if "linux" in sys.platform:
@@ -109,6 +133,28 @@ class Taunt(commands.Cog):
 
         self.log.info(f"Registered {self.__class__.__name__} cog to {bot_name}")
 
+    def get_manifest(self, manifest: str) -> List[Dict[str, Any]]:
+        """
+        Fetches the taunt manifest, preferring the shared cache.
+
+        :param manifest: The name of the manifest file
+        :return: The list of taunts
+        """
+        cached: Optional[List[Dict[str, Any]]] = None
+        if self._cache is not None:
+            cached = self._cache.get_json(self._cache_namespace, manifest)
+        if cached is not None:
+            return cached
+
+        data: List[Dict[str, Any]] = json.load(
+            self._do_api.get_object(self._space, manifest)
+        )
+        if self._cache is not None:
+            self._cache.set_json(
+                self._cache_namespace, manifest, data, ttl=self._cache_ttl
+            )
+        return data
+
     def get_taunt_range(self) -> Tuple[int, int]:
         min_num: int = 1
         max_num: int = 1
@@ -131,9 +177,51 @@ class Taunt(commands.Cog):
                 return self._do_api.get_object(self._space, taunt["file"])
         return None
 
+    def get_taunt_pcm(self, num: int) -> Optional[bytes]:
+        """
+        Fetches a taunt decoded to PCM, preferring the shared cache so it is only decoded once.
+
+        :param num: The taunt number
+        :return: The 48kHz stereo 16-bit PCM audio, or None if the taunt does not exist
+        """
+        taunt_file: Optional[str] = None
+        for taunt in self._manifest:
+            if taunt["num"] == num:
+                taunt_file = taunt["file"]
+        if taunt_file is None:
+            return None
+
+        # keyed by file too, so a taunt pointed at a new file by the manifest is decoded again
+        key: str = f"{num}:{taunt_file}.pcm"
+        pcm: Optional[bytes] = None
+        if self._cache is not None:
+            pcm = self._cache.get(self._cache_namespace, key)
+        if pcm is not None:
+            return pcm
+
+        taunt_audio: Optional[io.BytesIO] = self.get_taunt_audio(num)
+        if taunt_audio is None:
+            return None
+        source: FFmpegPCMAudio = FFmpegPCMAudio(taunt_audio.read(), pipe=True)
+        try:
+            pcm = source.pcm()
+        finally:
+            source.cleanup()
+            taunt_audio.close()
+
+        if self._cache is not None:
+            self._cache.set(self._cache_namespace, key, pcm, ttl=self._cache_ttl)
+        return pcm
+
     @commands.command()
     async def stop(self, ctx) -> None:
-        self.loop = False
+        """
+        Stops the looping taunts of this server.
+
+        Usage: !stop
+        """
+        if ctx.guild is not None:
+            self._loops[ctx.guild.id].clear()
 
     @commands.command(aliases=["t"])
     async def taunt(self, ctx, number: int, delay: Optional[int] = None) -> None:
@@ -148,10 +236,6 @@ class Taunt(commands.Cog):
 
         Usage: !taunt <number: int> [delay: int]
         """
-        if delay:
-            # if a delay is set, then enable looping audio
-            self.loop = True
-
         taunt_text: Optional[str]
         try:
             taunt_text = self.get_taunt_text(number)
@@ -167,26 +251,50 @@ class Taunt(commands.Cog):
             return
 
         if ctx.author.voice.channel:
-            if ctx.bot.voice_clients:
-                voice_client: discord.VoiceClient = ctx.bot.voice_clients[0]
-                if voice_client.channel != ctx.author.voice.channel:
-                    await voice_client.move_to(ctx.author.voice.channel)
-            else:
-                voice_client = await ctx.author.voice.channel.connect(timeout=10)  # type: ignore
-
-            taunt_audio: io.BytesIO
-            while True:
-                taunt_audio = self.get_taunt_audio(number)
-                voice_client.play(
-                    FFmpegPCMAudio(taunt_audio.read(), pipe=True)
-                )
-                while voice_client.is_playing():
-                    await asyncio.sleep(1)
-
-                if delay:
-                    await asyncio.sleep(float(delay))
-
-                if not self.loop:
-                    break
-
-            taunt_audio.close()
+            taunt_pcm: Optional[bytes] = self.get_taunt_pcm(number)
+            if taunt_pcm is None:
+                return
+
+            # timed from here, so only the connection and not the decode counts towards time to first audio
+            requested: Optional[float] = time.monotonic()
+            self._voice.record_activity(ctx.author.voice.channel)
+            voice_client: discord.VoiceClient
+            reused: bool
+            voice_client, reused = await self._voice.acquire(ctx.author.voice.channel)
+
+            if self._admission is not None:
+                # a loop can run for hours, so it is held to its budget instead of keeping a voice slot
+                self._admission.release(ctx)
+
+            loops: Set[int] = self._loops[voice_client.guild.id]
+            if delay:
+                # if a delay is set, then loop until stopped
+                loops.add(ctx.message.id)
+            try:
+                while True:
+                    voice_client.play(discord.PCMAudio(io.BytesIO(taunt_pcm)))
+                    if requested is not None:
+                        self._voice.record_first_audio(
+                            time.monotonic() - requested, reused
+                        )
+                        requested = None
+                    while voice_client.is_playing():
+                        await asyncio.sleep(1)
+                    self._voice.touch(voice_client.guild)
+
+                    if delay:
+                        await asyncio.sleep(float(delay))
+
+                    if ctx.message.id not in loops:
+                        break
+
+                    if self._admission is not None:
+                        try:
+                            self._admission.charge(
+                                ctx, self._admission.repeat_cost(delay)
+                            )
+                        except RateLimited:
+                            await ctx.send("Stopped looping, the taunt budget ran out.")
+                            break
+            finally:
+                loops.discard(ctx.message.id)
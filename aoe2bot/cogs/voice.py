@@ -0,0 +1,281 @@
+import asyncio
+import collections
+import logging
+import time
+from typing import Deque, Dict, List, Optional, Tuple
+
+import discord  # type: ignore
+from discord.ext import commands, tasks  # type: ignore
+
+
+class VoicePool(commands.Cog):
+    """Keeps voice connections alive between taunts."""
+
+    log: logging.Logger
+    _bot: commands.Bot
+    _idle_timeout: float
+    _prewarm: bool
+    _activity_window: float
+    _last_used: Dict[int, float]
+    _channels: Dict[int, int]
+    _activity: Dict[int, Dict[int, float]]
+    _first_audio: Dict[bool, Deque[float]]
+
+    def __init__(
+        self,
+        bot: commands.Bot,
+        bot_name: str,
+        idle_timeout: float = 900.0,
+        prewarm: bool = True,
+        activity_window: float = 3600.0,
+    ) -> None:
+        """
+        Initialize the VoicePool cog.
+
+        :param bot: The bot the cog is attached to
+        :param bot_name: The name of the bot for logging purposes
+        :param idle_timeout: Seconds a connection may sit idle before it is closed
+        :param prewarm: Connect ahead of time to channels with recent taunt activity
+        :param activity_window: Seconds taunt activity in a channel is considered recent
+        """
+        self.log = logging.getLogger(f"{bot_name}.{self.__class__.__name__}")
+
+        self._bot = bot
+        self._idle_timeout = idle_timeout
+        self._prewarm = prewarm
+        self._activity_window = activity_window
+
+        self._last_used = {}
+        self._channels = {}
+        self._activity = collections.defaultdict(dict)
+        self._first_audio = {
+            True: collections.deque(maxlen=256),
+            False: collections.deque(maxlen=256),
+        }
+
+        self._evict.start()
+
+        self.log.info(f"Registered {self.__class__.__name__} cog to {bot_name}")
+
+    def cog_unload(self) -> None:
+        self._evict.cancel()
+
+    async def acquire(
+        self, channel: discord.VoiceChannel
+    ) -> Tuple[discord.VoiceClient, bool]:
+        """
+        Returns a connected voice client for a channel, reusing the guild's connection if possible.
+
+        :param channel: The voice channel to play in
+        :return: The voice client and whether an existing connection was reused as-is
+        """
+        guild: discord.Guild = channel.guild
+        voice_client: discord.VoiceClient = guild.voice_client
+        reused: bool = True
+
+        if voice_client is None or not voice_client.is_connected():
+            if voice_client is not None:
+                await voice_client.disconnect(force=True)
+            self.log.debug(f"Connecting to {channel} in {guild}")
+            voice_client = await channel.connect(timeout=10)
+            reused = False
+        elif voice_client.channel != channel:
+            self.log.debug(f"Moving to {channel} in {guild}")
+            await voice_client.move_to(channel)
+            reused = False
+
+        self._channels[guild.id] = channel.id
+        self.touch(guild)
+        return voice_client, reused
+
+    def touch(self, guild: discord.Guild) -> None:
+        """
+        Marks a guild's connection as in use, postponing its eviction.
+
+        :param guild: The guild whose connection was used
+        """
+        self._last_used[guild.id] = time.monotonic()
+
+    def record_activity(self, channel: discord.VoiceChannel) -> None:
+        """
+        Records taunt activity in a channel, making it a candidate for pre-warming.
+
+        :param channel: The voice channel a taunt was requested for
+        """
+        self._activity[channel.guild.id][channel.id] = time.monotonic()
+
+    def record_first_audio(self, seconds: float, reused: bool) -> None:
+        """
+        Records the time from a taunt request to the start of playback.
+
+        :param seconds: The time to first audio
+        :param reused: Whether the play reused an existing connection
+        """
+        self._first_audio[reused].append(seconds)
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug(
+                "Time to first audio %.0fms (%s)",
+                seconds * 1000,
+                "warm" if reused else "cold",
+            )
+
+    def dump_activity(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns the recent taunt activity in a JSON serializable form, with wall clock times.
+
+        :return: The time of the last taunt for each channel, by guild
+        """
+        offset: float = time.time() - time.monotonic()
+        return {
+            str(guild_id): {
+                str(channel_id): ts + offset for channel_id, ts in channels.items()
+            }
+            for guild_id, channels in self._activity.items()
+        }
+
+    def load_activity(self, data: Dict[str, Dict[str, float]]) -> None:
+        """
+        Merges in taunt activity returned by `dump_activity`.
+
+        :param data: The dumped activity
+        """
+        offset: float = time.time() - time.monotonic()
+        for guild_id, channels in data.items():
+            for channel_id, ts in channels.items():
+                current: float = self._activity[int(guild_id)].get(int(channel_id), 0.0)
+                self._activity[int(guild_id)][int(channel_id)] = max(
+                    current, ts - offset
+                )
+
+    def _recent_channel(self, guild_id: int) -> Optional[int]:
+        """
+        Finds the most recently active taunt channel in a guild.
+
+        :param guild_id: The guild id
+        :return: The channel id, or None if there was no recent activity
+        """
+        now: float = time.monotonic()
+        recent: List[Tuple[float, int]] = [
+            (ts, channel_id)
+            for channel_id, ts in self._activity.get(guild_id, {}).items()
+            if now - ts < self._activity_window
+        ]
+        if not recent:
+            return None
+        return max(recent)[1]
+
+    async def _connect_if_occupied(self, channel: discord.VoiceChannel) -> None:
+        """
+        Pre-connects to a channel, as long as someone other than a bot is in it.
+
+        :param channel: The voice channel to connect to
+        """
+        if channel.guild.voice_client is not None:
+            return
+        if not any(not member.bot for member in channel.members):
+            return
+
+        self.log.debug(f"Pre-warming connection to {channel} in {channel.guild}")
+        try:
+            await self.acquire(channel)
+        except (asyncio.TimeoutError, discord.DiscordException):
+            self.log.exception(f"Failed to pre-warm {channel}")
+
+    async def prewarm(self) -> None:
+        """Pre-connects to the most recently active taunt channel of every guild."""
+        if not self._prewarm:
+            return
+
+        for guild_id in list(self._activity):
+            channel_id = self._recent_channel(guild_id)
+            if channel_id is None:
+                continue
+            channel = self._bot.get_channel(channel_id)
+            if isinstance(channel, discord.VoiceChannel):
+                await self._connect_if_occupied(channel)
+
+    @tasks.loop(seconds=30)
+    async def _evict(self) -> None:
+        """Disconnects connections that have been idle for longer than the idle timeout."""
+        now: float = time.monotonic()
+        for voice_client in list(self._bot.voice_clients):
+            guild_id: int = voice_client.guild.id
+            if voice_client.is_playing():
+                self._last_used[guild_id] = now
+                continue
+
+            last_used: float = self._last_used.setdefault(guild_id, now)
+            if now - last_used > self._idle_timeout:
+                self.log.debug(f"Evicting idle connection in {voice_client.guild}")
+                await voice_client.disconnect()
+                self._last_used.pop(guild_id, None)
+                self._channels.pop(guild_id, None)
+
+    @_evict.before_loop
+    async def _before_evict(self) -> None:
+        await self._bot.wait_until_ready()
+
+    @commands.Cog.listener()
+    async def on_ready(self) -> None:
+        await self.prewarm()
+
+    @commands.Cog.listener()
+    async def on_resumed(self) -> None:
+        """Re-establishes pooled connections that were dropped while the gateway was away."""
+        for guild_id, channel_id in list(self._channels.items()):
+            guild = self._bot.get_guild(guild_id)
+            channel = self._bot.get_channel(channel_id)
+            if guild is None or not isinstance(channel, discord.VoiceChannel):
+                self._channels.pop(guild_id, None)
+                continue
+
+            voice_client = guild.voice_client
+            if voice_client is not None and voice_client.is_connected():
+                continue
+
+            self.log.debug(f"Reconnecting to {channel} in {guild} after resume")
+            try:
+                await self.acquire(channel)
+            except (asyncio.TimeoutError, discord.DiscordException):
+                self.log.exception(f"Failed to reconnect to {channel}")
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member, before, after) -> None:
+        """
+        Forgets connections the bot was removed from and pre-warms channels users join.
+
+        :param member: The member whose voice state changed
+        :param before: The previous voice state
+        :param after: The new voice state
+        """
+        if member.id == self._bot.user.id:
+            if after.channel is None:
+                self._channels.pop(member.guild.id, None)
+                self._last_used.pop(member.guild.id, None)
+            return
+
+        if not self._prewarm or after.channel is None or member.bot:
+            return
+        if before.channel == after.channel:
+            return
+        if self._recent_channel(member.guild.id) == after.channel.id:
+            await self._connect_if_occupied(after.channel)
+
+    @commands.command()
+    async def voicestats(self, ctx) -> None:
+        """
+        Shows the time from a taunt request to the start of playback.
+
+        Usage: !voicestats
+        """
+        results: List[str] = ["Time to first audio:"]
+        for reused, label in [(True, "Reused connection"), (False, "New connection")]:
+            samples: List[float] = sorted(self._first_audio[reused])
+            if not samples:
+                results.append(f"- {label}: *no plays yet*")
+                continue
+            median: float = samples[len(samples) // 2]
+            results.append(
+                f"- {label}: *{median * 1000:.0f}ms* median over {len(samples)} plays"
+            )
+        await ctx.send("\n".join(results))
@@ -0,0 +1,384 @@
+import array
+import bisect
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# (timestamp, min, max, last)
+Point = Tuple[int, int, int, int]
+
+DAY: int = 86400
+WEEK: int = 7 * DAY
+
+
+class RatingHistory:
+    """
+    An append-only time series store of player ratings, per profile and leaderboard.
+
+    Points are kept in columnar chunks of `array` backed timestamps and ratings, and every append also updates daily
+    and weekly rollups, so queries over long ranges only read a single small blob. A point is only appended when the
+    rating changed, or a day after the previous point.
+    """
+
+    log: logging.Logger
+    _path: str
+    _conn: sqlite3.Connection
+    _lock: threading.Lock
+
+    _path_env: str = "AOE2BOT_HISTORY_PATH"
+    _default_path: str = os.path.join(
+        tempfile.gettempdir(), "aoe2bot", "history.sqlite3"
+    )
+    _chunk_size: int = 512
+    _resolutions: Dict[str, int] = {"daily": DAY, "weekly": WEEK}
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """
+        Opens (and creates if needed) the history database.
+
+        :param path: The database file, defaults to the `AOE2BOT_HISTORY_PATH` env var or a file in the temp directory
+        """
+        self.log = logging.getLogger(f"{self.__class__.__name__}")
+
+        self._path = path or os.getenv(self._path_env) or self._default_path
+        os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self._path, timeout=10.0, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " profile_id INTEGER NOT NULL,"
+            " board INTEGER NOT NULL,"
+            " start INTEGER NOT NULL,"
+            " end INTEGER NOT NULL,"
+            " times BLOB NOT NULL,"
+            " ratings BLOB NOT NULL,"
+            " PRIMARY KEY (profile_id, board, start)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rollups ("
+            " profile_id INTEGER NOT NULL,"
+            " board INTEGER NOT NULL,"
+            " resolution TEXT NOT NULL,"
+            " buckets BLOB NOT NULL,"
+            " mins BLOB NOT NULL,"
+            " maxs BLOB NOT NULL,"
+            " lasts BLOB NOT NULL,"
+            " PRIMARY KEY (profile_id, board, resolution)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS profiles ("
+            " name TEXT PRIMARY KEY,"
+            " profile_id INTEGER NOT NULL"
+            ") WITHOUT ROWID"
+        )
+
+        self.log.debug(f"Opened rating history at {self._path}")
+
+    @staticmethod
+    def _array(typecode: str, blob: bytes = b"") -> array.array:
+        values: array.array = array.array(typecode)
+        values.frombytes(blob)
+        return values
+
+    @staticmethod
+    def bucket(ts: int, width: int) -> int:
+        """
+        The start of the rollup bucket a timestamp falls in, weeks start on Monday.
+
+        :param ts: The timestamp
+        :param width: The bucket width in seconds
+        :return: The bucket start timestamp
+        """
+        # the epoch was a Thursday
+        offset: int = 4 * DAY if width == WEEK else 0
+        return (ts - offset) // width * width + offset
+
+    def record(
+        self,
+        name: str,
+        profile_id: int,
+        board: int,
+        rating: int,
+        ts: Optional[int] = None,
+    ) -> bool:
+        """
+        Appends a rating to a profile's history.
+
+        :param name: The player name, so the history can be found by name
+        :param profile_id: The profile id
+        :param board: The leaderboard id
+        :param rating: The rating
+        :param ts: The time of the rating, defaults to now
+        :return: Whether a point was appended
+        """
+        ts = int(time.time()) if ts is None else int(ts)
+        with self._lock:
+            # most lookups change nothing, those are answered without taking the write lock
+            known: bool = self._profile_id(name) == profile_id
+            if known and not self._is_new(
+                self._last_point(profile_id, board), rating, ts
+            ):
+                return False
+
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if not known:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO profiles (name, profile_id) VALUES (?, ?)",
+                        (name.lower(), profile_id),
+                    )
+                appended: bool = self._append(profile_id, board, rating, ts)
+                if appended:
+                    for resolution, width in self._resolutions.items():
+                        self._rollup(profile_id, board, resolution, width, rating, ts)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return appended
+
+    def record_players(self, players: List[Dict[str, Any]]) -> int:
+        """
+        Appends the ratings from leaderboard entries, as returned by `AoE2net.find_name`.
+
+        Ratings are timestamped with the player's last match, so a response served from an old snapshot records the
+        rating at the time it was current, rather than as a step back to it now.
+
+        :param players: The leaderboard entries, each with a name, profile_id, rating and leaderboard
+        :return: The number of points appended
+        """
+        appended: int = 0
+        for player in players:
+            if player.get("rating") is None or player.get("profile_id") is None:
+                continue
+            appended += self.record(
+                player["name"],
+                int(player["profile_id"]),
+                int(player["leaderboard"]),
+                int(player["rating"]),
+                player.get("last_match_time"),
+            )
+        return appended
+
+    def _profile_id(self, name: str) -> Optional[int]:
+        row = self._conn.execute(
+            "SELECT profile_id FROM profiles WHERE name = ?", (name.lower(),)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def _last_point(
+        self, profile_id: int, board: int
+    ) -> Optional[Tuple[int, int, array.array, array.array]]:
+        row = self._conn.execute(
+            "SELECT start, times, ratings FROM chunks"
+            " WHERE profile_id = ? AND board = ? ORDER BY start DESC LIMIT 1",
+            (profile_id, board),
+        ).fetchone()
+        if row is None:
+            return None
+        start, times_blob, ratings_blob = row
+        times: array.array = self._array("q", times_blob)
+        ratings: array.array = self._array("h", ratings_blob)
+        return start, times[-1], times, ratings
+
+    @staticmethod
+    def _is_new(
+        last: Optional[Tuple[int, int, array.array, array.array]], rating: int, ts: int
+    ) -> bool:
+        """
+        Whether a rating should be appended after the last point of a series.
+
+        :param last: The last chunk of the series, as returned by `_last_point`
+        :param rating: The rating
+        :param ts: The time of the rating
+        :return: True for a new series, a changed rating, or a repeat a day after the last point
+        """
+        if last is None:
+            return True
+        _, last_ts, _, ratings = last
+        if ts < last_ts:
+            return False
+        return ratings[-1] != rating or ts - last_ts >= DAY
+
+    def _append(self, profile_id: int, board: int, rating: int, ts: int) -> bool:
+        last = self._last_point(profile_id, board)
+        if not self._is_new(last, rating, ts):
+            return False
+
+        if last is not None:
+            start, _, times, ratings = last
+            if len(times) < self._chunk_size:
+                times.append(ts)
+                ratings.append(rating)
+                self._conn.execute(
+                    "UPDATE chunks SET end = ?, times = ?, ratings = ?"
+                    " WHERE profile_id = ? AND board = ? AND start = ?",
+                    (
+                        ts,
+                        times.tobytes(),
+                        ratings.tobytes(),
+                        profile_id,
+                        board,
+                        start,
+                    ),
+                )
+                return True
+
+        self._conn.execute(
+            "INSERT INTO chunks (profile_id, board, start, end, times, ratings)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                profile_id,
+                board,
+                ts,
+                ts,
+                array.array("q", [ts]).tobytes(),
+                array.array("h", [rating]).tobytes(),
+            ),
+        )
+        return True
+
+    def _rollup(
+        self,
+        profile_id: int,
+        board: int,
+        resolution: str,
+        width: int,
+        rating: int,
+        ts: int,
+    ) -> None:
+        row = self._conn.execute(
+            "SELECT buckets, mins, maxs, lasts FROM rollups"
+            " WHERE profile_id = ? AND board = ? AND resolution = ?",
+            (profile_id, board, resolution),
+        ).fetchone()
+        buckets, mins, maxs, lasts = [
+            self._array(typecode, blob)
+            for typecode, blob in zip("qhhh", row or (b"", b"", b"", b""))
+        ]
+
+        bucket: int = self.bucket(ts, width)
+        if buckets and buckets[-1] == bucket:
+            mins[-1] = min(mins[-1], rating)
+            maxs[-1] = max(maxs[-1], rating)
+            lasts[-1] = rating
+        else:
+            buckets.append(bucket)
+            mins.append(rating)
+            maxs.append(rating)
+            lasts.append(rating)
+
+        self._conn.execute(
+            "INSERT OR REPLACE INTO rollups"
+            " (profile_id, board, resolution, buckets, mins, maxs, lasts)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                profile_id,
+                board,
+                resolution,
+                buckets.tobytes(),
+                mins.tobytes(),
+                maxs.tobytes(),
+                lasts.tobytes(),
+            ),
+        )
+
+    def profile_id(self, name: str) -> Optional[int]:
+        """
+        Finds the profile id last recorded for a player name.
+
+        :param name: The player name, case-insensitive
+        :return: The profile id, or None if the player has no history
+        """
+        with self._lock:
+            return self._profile_id(name)
+
+    def query(
+        self,
+        profile_id: int,
+        board: int,
+        start: int,
+        end: Optional[int] = None,
+        resolution: Optional[str] = None,
+    ) -> Tuple[str, List[Point]]:
+        """
+        Queries a profile's rating history over a time range.
+
+        :param profile_id: The profile id
+        :param board: The leaderboard id
+        :param start: The start of the range
+        :param end: The end of the range, defaults to now
+        :param resolution: raw, daily or weekly, defaults to raw up to 30 days, daily up to 2 years, weekly beyond
+        :return: The resolution used and the (timestamp, min, max, last) points
+        """
+        end = int(time.time()) if end is None else end
+        if resolution is None:
+            span: int = end - start
+            if span <= 30 * DAY:
+                resolution = "raw"
+            elif span <= 730 * DAY:
+                resolution = "daily"
+            else:
+                resolution = "weekly"
+
+        if resolution == "raw":
+            return resolution, self._query_raw(profile_id, board, start, end)
+        return resolution, self._query_rollup(profile_id, board, resolution, start, end)
+
+    def _query_raw(
+        self, profile_id: int, board: int, start: int, end: int
+    ) -> List[Point]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT times, ratings FROM chunks"
+                " WHERE profile_id = ? AND board = ? AND end >= ? AND start <= ?"
+                " ORDER BY start",
+                (profile_id, board, start, end),
+            ).fetchall()
+
+        points: List[Point] = []
+        for times_blob, ratings_blob in rows:
+            times: array.array = self._array("q", times_blob)
+            ratings: array.array = self._array("h", ratings_blob)
+            for ts, rating in zip(times, ratings):
+                if start <= ts <= end:
+                    points.append((ts, rating, rating, rating))
+        return points
+
+    def _query_rollup(
+        self, profile_id: int, board: int, resolution: str, start: int, end: int
+    ) -> List[Point]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT buckets, mins, maxs, lasts FROM rollups"
+                " WHERE profile_id = ? AND board = ? AND resolution = ?",
+                (profile_id, board, resolution),
+            ).fetchone()
+        if row is None:
+            return []
+
+        buckets, mins, maxs, lasts = [
+            self._array(typecode, blob) for typecode, blob in zip("qhhh", row)
+        ]
+        lo: int = bisect.bisect_left(
+            buckets, self.bucket(start, self._resolutions[resolution])
+        )
+        hi: int = bisect.bisect_right(buckets, end)
+        return list(zip(buckets[lo:hi], mins[lo:hi], maxs[lo:hi], lasts[lo:hi]))
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,206 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+command_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "command", default=None
+)
+request_var: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar(
+    "request_id", default=None
+)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def bind(command: Optional[str], request_id: Optional[int]) -> None:
+    """
+    Tags every record logged by the current task with a command and request id.
+
+    :param command: The command name
+    :param request_id: The id of the request, the message id for commands
+    """
+    command_var.set(command)
+    request_var.set(request_id)
+
+
+class ContextFilter(logging.Filter):
+    """Adds the bound command and request id, and the count of records sampled away before it, to records."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.command = command_var.get()
+        record.request_id = request_var.get()
+        record.context = (
+            f" [{record.command}:{record.request_id}]" if record.command else ""
+        )
+        dropped: int = getattr(record, "dropped", 0)
+        if dropped:
+            record.context += f" ({dropped} dropped)"
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Rate limits high-volume records per call site.
+
+    Each call site gets a token bucket of `burst` records refilled at `rate` records per second. Once it is empty,
+    only a `sample` fraction of records get through, each carrying the count of records dropped before it.
+    """
+
+    _level: int
+    _rate: float
+    _burst: float
+    _sample: float
+    _buckets: Dict[Tuple[str, int], Tuple[float, float, int]]
+    _lock: threading.Lock
+
+    def __init__(
+        self,
+        level: int = logging.DEBUG,
+        rate: float = 5.0,
+        burst: float = 20.0,
+        sample: float = 0.01,
+    ) -> None:
+        """
+        :param level: Records at or below this level are rate limited
+        :param rate: Records per second allowed per call site
+        :param burst: Records allowed in a burst per call site
+        :param sample: Fraction of records let through once a call site is over its rate
+        """
+        super().__init__()
+        self._level = level
+        self._rate = rate
+        self._burst = burst
+        self._sample = sample
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self._level:
+            return True
+
+        key: Tuple[str, int] = (record.pathname, record.lineno)
+        now: float = time.monotonic()
+        with self._lock:
+            tokens, last, dropped = self._buckets.get(key, (self._burst, now, 0))
+            tokens = min(self._burst, tokens + (now - last) * self._rate)
+            if tokens >= 1.0 or random.random() < self._sample:
+                self._buckets[key] = (max(tokens - 1.0, 0.0), now, 0)
+                record.dropped = dropped
+                return True
+            self._buckets[key] = (tokens, now, dropped + 1)
+            return False
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formats records as single line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.process,
+            "msg": record.getMessage(),
+        }
+        for field in ["command", "request_id", "dropped"]:
+            value: Any = getattr(record, field, None)
+            if value:
+                data[field] = value
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, default=str)
+
+
+class TracebackQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queues records with their traceback kept apart from the message.
+
+    The stock handler merges the traceback into the message, which would leave structured output without an `exc`
+    field. Here it is rendered to `exc_text` instead, which formatters append to plain text output on their own.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+def setup_logging(
+    level: int = logging.DEBUG,
+    structured: bool = False,
+    sample: Optional[SamplingFilter] = None,
+) -> logging.handlers.QueueListener:
+    """
+    Routes all logging through a queue to a background thread that writes to stderr.
+
+    Calling this again replaces the previous setup.
+
+    :param level: The root log level
+    :param structured: Whether to write JSON lines instead of plain text
+    :param sample: A filter rate limiting high-volume records, defaults to rate limiting debug records
+    :return: The started queue listener
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+    else:
+        # the listener thread is a daemon, records still queued at exit would be lost
+        atexit.register(stop_logging)
+
+    stream: logging.Handler = logging.StreamHandler(sys.stderr)
+    if structured:
+        stream.setFormatter(StructuredFormatter())
+    else:
+        stream.setFormatter(
+            logging.Formatter("%(levelname)s:%(name)s:%(message)s%(context)s")
+        )
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler: logging.handlers.QueueHandler = TracebackQueueHandler(records)
+    queue_handler.addFilter(sample or SamplingFilter())
+    queue_handler.addFilter(ContextFilter())
+
+    root: logging.Logger = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(records, stream)
+    _listener.start()
+    return _listener
+
+
+def stop_logging() -> None:
+    """Flushes queued records and stops the background thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def set_level(level: str, logger: Optional[str] = None) -> None:
+    """
+    Changes a logger's level at runtime.
+
+    :param level: The level name (ex: DEBUG, INFO)
+    :param logger: The logger name, the root logger if None
+    :raises: ValueError if the level name is unknown
+    """
+    levelno: Any = logging.getLevelName(level.upper())
+    if not isinstance(levelno, int):
+        raise ValueError(f"Unknown log level '{level}'")
+    logging.getLogger(logger).setLevel(levelno)
@@ -1,9 +1,11 @@
 import argparse
 import logging
+import multiprocessing
+from typing import List, Optional
 
+from aoe2bot import logs
 from aoe2bot.bot import AoE2Bot
 
-logging.basicConfig(level=logging.DEBUG)
 log: logging.Logger = logging.getLogger("main")
 
 logging.getLogger("asyncio").setLevel(logging.INFO)
@@ -16,15 +18,124 @@ logging.getLogger("urllib3").setLevel(logging.INFO)
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Default")
     parser.add_argument("--debug", help="debug", action="store_true")
+    parser.add_argument(
+        "--shards",
+        help="total number of shards, 0 uses Discord's recommended count",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--workers",
+        help="number of worker processes, each owning a range of the shards",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--log-format",
+        help="log output format",
+        choices=["text", "json"],
+        default="text",
+    )
+    parser.add_argument(
+        "--log-rate",
+        help="debug records per second allowed from each log call site",
+        type=float,
+        default=5.0,
+    )
     return parser.parse_args()
 
 
+def setup_logging(args: argparse.Namespace) -> None:
+    """
+    Sets up queued logging for the current process.
+
+    :param args: The parsed command line arguments
+    """
+    logs.setup_logging(
+        level=logging.DEBUG,
+        structured=args.log_format == "json",
+        sample=logs.SamplingFilter(rate=args.log_rate, burst=args.log_rate * 4),
+    )
+
+
+def run_bot(
+    args: argparse.Namespace,
+    shard_ids: Optional[List[int]],
+    shard_count: Optional[int],
+) -> None:
+    """
+    Runs a bot owning the given shards until it is closed.
+
+    :param args: The parsed command line arguments
+    :param shard_ids: The shards this bot connects, all of them if None
+    :param shard_count: The total number of shards, Discord's recommended count if None
+    """
+    setup_logging(args)
+
+    prefix: str = "$" if args.debug else "!"
+    try:
+        bot = AoE2Bot(
+            args.debug,
+            command_prefix=prefix,
+            shard_ids=shard_ids,
+            shard_count=shard_count,
+        )
+        bot.run()
+    finally:
+        logs.stop_logging()
+
+
+def shard_ranges(shard_count: int, workers: int) -> List[List[int]]:
+    """
+    Splits the shards into contiguous ranges, one per worker.
+
+    :param shard_count: The total number of shards
+    :param workers: The number of workers
+    :return: The shard ids owned by each worker
+    """
+    return [
+        list(range(w * shard_count // workers, (w + 1) * shard_count // workers))
+        for w in range(workers)
+    ]
+
+
 def main() -> None:
     args: argparse.Namespace = parse_args()
 
-    prefix: str = "$" if args.debug else "!"
-    bot = AoE2Bot(args.debug, command_prefix=prefix)
-    bot.run()
+    shard_count: Optional[int] = args.shards or None
+    if args.workers <= 1:
+        run_bot(args, None, shard_count)
+        return
+
+    setup_logging(args)
+
+    if shard_count is None or shard_count < args.workers:
+        log.error("--shards must be at least --workers when running multiple workers")
+        logs.stop_logging()
+        return
+
+    ctx = multiprocessing.get_context("spawn")
+    processes: List[multiprocessing.process.BaseProcess] = []
+    for shard_ids in shard_ranges(shard_count, args.workers):
+        process = ctx.Process(
+            target=run_bot,
+            args=(args, shard_ids, shard_count),
+            name=f"aoe2bot-shards-{shard_ids[0]}-{shard_ids[-1]}",
+        )
+        process.start()
+        log.info(f"Started {process.name} (pid {process.pid})")
+        processes.append(process)
+
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+    finally:
+        logs.stop_logging()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,120 @@
+import heapq
+import math
+import threading
+import time
+from typing import Dict, List, Tuple, Union
+
+
+def lookup_key(kind: str, profile_id: Union[int, str], name: str) -> str:
+    """
+    The popularity key of a player lookup.
+
+    The name is the one searched for, as that is what the lookup's API responses are cached by.
+
+    :param kind: The lookup kind, elo or civs
+    :param profile_id: The profile id of the player the lookup found
+    :param name: The name that was searched for
+    :return: The key
+    """
+    return f"{kind}:{profile_id}:{name}"
+
+
+def parse_lookup_key(key: str) -> Tuple[str, str, str]:
+    """
+    Splits a key made by `lookup_key`.
+
+    :param key: The key
+    :return: The lookup kind, profile id and searched name
+    """
+    kind, profile_id, name = key.split(":", 2)
+    return kind, profile_id, name
+
+
+class Popularity:
+    """
+    A least frequently used counter whose counts decay over time.
+
+    Every hit adds one to a key's score, and scores halve every `half_life` seconds, so the top keys follow what is
+    popular now rather than what was popular at some point.
+    """
+
+    _half_life: float
+    _max_keys: int
+    _scores: Dict[str, Tuple[float, float]]
+    _lock: threading.Lock
+
+    def __init__(self, half_life: float = 86400.0, max_keys: int = 10000) -> None:
+        """
+        :param half_life: Seconds for a score to decay to half
+        :param max_keys: The number of keys to track, the least popular are dropped beyond this
+        """
+        self._half_life = half_life
+        self._max_keys = max_keys
+        self._scores = {}
+        self._lock = threading.Lock()
+
+    def _decayed(self, score: float, last: float, now: float) -> float:
+        return score * math.pow(2.0, -(now - last) / self._half_life)
+
+    def record(self, key: str) -> None:
+        """
+        Records a hit for a key.
+
+        :param key: The key that was looked up
+        """
+        now: float = time.time()
+        with self._lock:
+            score, last = self._scores.get(key, (0.0, now))
+            self._scores[key] = (self._decayed(score, last, now) + 1.0, now)
+            if len(self._scores) > self._max_keys:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        keep: int = self._max_keys * 9 // 10
+        self._scores = dict(
+            heapq.nlargest(
+                keep,
+                self._scores.items(),
+                key=lambda item: self._decayed(item[1][0], item[1][1], now),
+            )
+        )
+
+    def top(self, n: int) -> List[Tuple[str, float]]:
+        """
+        Returns the most popular keys.
+
+        :param n: The number of keys
+        :return: The keys and their current scores, most popular first
+        """
+        now: float = time.time()
+        with self._lock:
+            scores: List[Tuple[str, float]] = [
+                (key, self._decayed(score, last, now))
+                for key, (score, last) in self._scores.items()
+            ]
+        return heapq.nlargest(n, scores, key=lambda item: item[1])
+
+    def dump(self) -> Dict[str, List[float]]:
+        """
+        Returns the scores in a JSON serializable form.
+
+        :return: The score and time of the last hit for each key
+        """
+        with self._lock:
+            return {key: [score, last] for key, (score, last) in self._scores.items()}
+
+    def load(self, data: Dict[str, List[float]]) -> None:
+        """
+        Merges in scores returned by `dump`.
+
+        :param data: The dumped scores
+        """
+        now: float = time.time()
+        with self._lock:
+            for key, (score, last) in data.items():
+                current, current_last = self._scores.get(key, (0.0, now))
+                self._scores[key] = (
+                    self._decayed(current, current_last, now)
+                    + self._decayed(score, last, now),
+                    now,
+                )
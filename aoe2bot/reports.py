@@ -0,0 +1,57 @@
+import csv
+import gzip
+import io
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+CivResult = Tuple[int, Optional[bool]]
+
+
+def build_civs_report(
+    players: List[Tuple[str, List[CivResult]]],
+    civ_names: Dict[int, str],
+    compress_threshold: Optional[int] = None,
+) -> Tuple[bytes, bool]:
+    """
+    Aggregates each player's civ results and writes them as a CSV.
+
+    This runs in a worker process, so it only takes and returns plain data.
+
+    :param players: The player names and their (civ id, won) results, won is None for custom games
+    :param civ_names: A lookup of civ id to civ name
+    :param compress_threshold: Gzip the CSV if it is larger than this many bytes, never if None
+    :return: The CSV bytes and whether they were gzipped
+    """
+
+    def defaultciv() -> Any:
+        return {"wins": 0, "losses": 0, "total": 0, "custom": 0}
+
+    data: io.StringIO = io.StringIO()
+    writer: csv.DictWriter = csv.DictWriter(
+        data, ["player", "civ", "wins", "losses", "custom", "total", "mode"]
+    )
+    writer.writeheader()
+    for name, results in players:
+        stats: Dict[str, Dict[str, int]] = defaultdict(defaultciv)
+        for civ_id, win in results:
+            civ: Optional[str] = civ_names.get(civ_id)
+            if not civ:
+                continue
+            stats[civ]["total"] += 1
+            if win is None:
+                stats[civ]["custom"] += 1
+            elif win:
+                stats[civ]["wins"] += 1
+            else:
+                stats[civ]["losses"] += 1
+
+        for c, s in stats.items():
+            row: Dict[str, Any] = {"player": name}
+            row.update({"civ": c})
+            row.update(s)
+            writer.writerow(row)
+
+    report: bytes = data.getvalue().encode()
+    if compress_threshold is not None and len(report) > compress_threshold:
+        return gzip.compress(report), True
+    return report, False
@@ -0,0 +1,53 @@
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import multiprocessing
+from typing import Any, Callable, Optional
+
+
+class WorkerPool:
+    """Runs CPU-bound command work in a pool of processes, off the event loop."""
+
+    log: logging.Logger
+    _max_workers: Optional[int]
+    _executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        """
+        Initializes the pool, the processes are started on first use.
+
+        :param max_workers: The number of worker processes, defaults to the number of CPUs
+        """
+        self.log = logging.getLogger(f"{self.__class__.__name__}")
+        self._max_workers = max_workers
+
+    def _get_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self._executor is None:
+            self.log.debug(f"Starting process pool with {self._max_workers} workers")
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Runs a function in a worker process.
+
+        The function and its arguments must be picklable, so keep them to module level functions and plain data.
+
+        :param func: The function to run
+        :param args: The arguments to call it with
+        :return: The function's return value
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), functools.partial(func, *args)
+        )
+
+    def shutdown(self) -> None:
+        """Stops the worker processes, cancelling any queued work."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
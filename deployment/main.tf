@@ -57,7 +57,7 @@ resource "digitalocean_droplet" "aoe2bot_droplet" {
     - git clone https://github.com/nathanqthai/aoe2bot.git
     - cd /root/aoe2bot
     - docker build -t aoe2dev .
-    - docker run -e DISCORD_BOT_TOKEN=${var.discord_bot_token} -e DIGITALOCEAN_SPACES_NAME=${digitalocean_spaces_bucket.aoe2bot_taunt_bucket.name} -e DIGITALOCEAN_SPACES_KEY_ID=${var.do_spaces_access_id} -e DIGITALOCEAN_SPACES_SECRET=${var.do_spaces_secret_key} --rm aoe2dev:latest
+    - docker run -e DISCORD_BOT_TOKEN=${var.discord_bot_token} -e DIGITALOCEAN_SPACES_NAME=${digitalocean_spaces_bucket.aoe2bot_taunt_bucket.name} -e DIGITALOCEAN_SPACES_KEY_ID=${var.do_spaces_access_id} -e DIGITALOCEAN_SPACES_SECRET=${var.do_spaces_secret_key} -v aoe2bot-data:/data --rm aoe2dev:latest
 
   EOF
 }
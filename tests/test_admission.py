@@ -0,0 +1,91 @@
+import types
+
+import pytest
+
+from aoe2bot import admission
+from aoe2bot.admission import Admission, RateLimited, TokenBucket
+
+
+class Clock:
+    """A monotonic clock that only moves when told to."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(admission.time, "monotonic", clock)
+    return clock
+
+
+def context(name: str, params: list, *args, user: int = 1, guild: int = 1):
+    """A command context as seen by a before invoke hook, cog commands get the cog and context ahead of the args."""
+    command = types.SimpleNamespace(
+        qualified_name=name, clean_params={param: None for param in params}
+    )
+    return types.SimpleNamespace(
+        command=command,
+        args=[object(), object(), *args],
+        author=types.SimpleNamespace(id=user),
+        guild=types.SimpleNamespace(id=guild),
+    )
+
+
+def test_bucket_refills_up_to_capacity(clock):
+    bucket = TokenBucket(capacity=4.0, rate=0.5)
+    assert bucket.consume(4.0) == 0.0
+    assert bucket.consume(1.0) == pytest.approx(2.0)
+
+    clock.now += 2.0
+    assert bucket.consume(1.0) == 0.0
+    assert bucket.consume(1.0) == pytest.approx(2.0)
+
+    clock.now += 3600.0
+    assert bucket.full
+    assert bucket.consume(4.0) == 0.0
+
+
+def test_bucket_caps_cost_at_capacity(clock):
+    bucket = TokenBucket(capacity=2.0, rate=1.0)
+    assert bucket.consume(5.0) == 0.0
+    assert bucket.consume(5.0) == pytest.approx(2.0)
+
+
+def test_bucket_refund_does_not_overfill(clock):
+    bucket = TokenBucket(capacity=2.0, rate=1.0)
+    bucket.consume(1.0)
+    bucket.refund(5.0)
+    assert bucket.full
+    assert bucket.consume(2.0) == 0.0
+    assert bucket.consume(1.0) == pytest.approx(1.0)
+
+
+def test_cost_reads_args_after_cog_and_context():
+    limits = Admission()
+    assert limits.cost(context("civs", ["names"], "a, b, c")) == 2.0 + 3
+    assert limits.cost(context("elo", ["name"], "a,b")) == 1.0
+    assert limits.cost(context("unknown", [])) == 0.5
+
+
+def test_cost_of_looping_taunts():
+    limits = Admission(min_taunt_delay=5.0)
+    assert limits.cost(context("taunt", ["number", "delay"], 11)) == 1.0
+    assert limits.cost(context("taunt", ["number", "delay"], 11, None)) == 1.0
+    assert limits.cost(context("taunt", ["number", "delay"], 11, 10)) == 1.0
+    assert limits.cost(context("taunt", ["number", "delay"], 11, 1)) == 5.0
+
+
+def test_guild_limit_refunds_the_user(clock):
+    limits = Admission(user_capacity=10.0, guild_capacity=3.0)
+    limits.charge(context("elo", [], user=1), 2.0)
+    with pytest.raises(RateLimited) as error:
+        limits.charge(context("elo", [], user=2), 2.0)
+    assert error.value.scope == "guild"
+
+    # user 2 got their tokens back, so they can still spend them in another guild
+    limits.charge(context("elo", [], user=2, guild=2), 10.0)
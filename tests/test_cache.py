@@ -0,0 +1,64 @@
+import os
+
+from aoe2bot.cache import SharedCache
+
+
+def restart(tmp_path, run: int) -> SharedCache:
+    """Starts a cache on a fresh live database, as a redeployed container would, with the last snapshot attached."""
+    cache = SharedCache(str(tmp_path / f"live{run}.sqlite3"))
+    cache.attach_snapshot(str(tmp_path / "snapshot.sqlite3"), revalidate=["aoe2net"])
+    return cache
+
+
+def test_snapshot_survives_two_restarts(tmp_path):
+    snapshot = str(tmp_path / "snapshot.sqlite3")
+
+    cache = restart(tmp_path, 1)
+    cache.set("taunt", "1.pcm", b"audio")
+    cache.snapshot(snapshot)
+    cache.close()
+
+    cache = restart(tmp_path, 2)
+    assert cache.get("taunt", "1.pcm") == b"audio"
+    cache.snapshot(snapshot)
+    cache.close()
+
+    cache = restart(tmp_path, 3)
+    assert cache.get("taunt", "1.pcm") == b"audio"
+    cache.close()
+
+
+def test_snapshot_prefers_live_entries(tmp_path):
+    snapshot = str(tmp_path / "snapshot.sqlite3")
+
+    cache = restart(tmp_path, 1)
+    cache.set("aoe2net", "strings", b"old")
+    cache.snapshot(snapshot)
+    cache.close()
+
+    cache = restart(tmp_path, 2)
+    cache.set("aoe2net", "strings", b"new")
+    cache.snapshot(snapshot)
+    cache.close()
+
+    cache = restart(tmp_path, 3)
+    assert cache.get("aoe2net", "strings") == b"new"
+    cache.close()
+    assert not [f for f in os.listdir(tmp_path) if f.endswith(".tmp")]
+
+
+def test_snapshot_serves_expired_entries_only_when_revalidated(tmp_path):
+    snapshot = str(tmp_path / "snapshot.sqlite3")
+
+    cache = restart(tmp_path, 1)
+    cache.set("aoe2net", "leaderboard", b"ratings", ttl=-1.0)
+    cache.set("taunt", "manifest.json", b"[]", ttl=-1.0)
+    cache.snapshot(snapshot)
+    cache.close()
+
+    cache = restart(tmp_path, 2)
+    assert cache.get("aoe2net", "leaderboard") == b"ratings"
+    assert cache.get("taunt", "manifest.json") is None
+    assert cache.pop_stale("aoe2net", 10) == ["leaderboard"]
+    assert cache.pop_stale("taunt", 10) == []
+    cache.close()
@@ -0,0 +1,89 @@
+import datetime
+
+import pytest
+
+from aoe2bot.history import DAY, WEEK, RatingHistory
+
+# Monday 2024-01-01 00:00 UTC
+MONDAY = int(datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc).timestamp())
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = RatingHistory(str(tmp_path / "history.sqlite3"))
+    yield history
+    history.close()
+
+
+def test_weeks_start_on_monday():
+    assert RatingHistory.bucket(MONDAY, WEEK) == MONDAY
+    assert RatingHistory.bucket(MONDAY + 6 * DAY + DAY - 1, WEEK) == MONDAY
+    assert RatingHistory.bucket(MONDAY + WEEK, WEEK) == MONDAY + WEEK
+    assert RatingHistory.bucket(MONDAY - 1, WEEK) == MONDAY - WEEK
+    assert RatingHistory.bucket(MONDAY + DAY + 3600, DAY) == MONDAY + DAY
+
+
+def test_unchanged_ratings_are_only_kept_daily(history):
+    assert history.record("Viper", 1, 3, 2000, MONDAY)
+    assert not history.record("Viper", 1, 3, 2000, MONDAY + 3600)
+    assert history.record("Viper", 1, 3, 2010, MONDAY + 7200)
+    assert not history.record("Viper", 1, 3, 2010, MONDAY + 7200 + DAY - 1)
+    assert history.record("Viper", 1, 3, 2010, MONDAY + 7200 + DAY)
+    # older than the last point, as served from a stale cache snapshot
+    assert not history.record("Viper", 1, 3, 1990, MONDAY + 3600)
+
+    _, points = history.query(1, 3, MONDAY, MONDAY + WEEK, "raw")
+    assert [(ts, last) for ts, _, _, last in points] == [
+        (MONDAY, 2000),
+        (MONDAY + 7200, 2010),
+        (MONDAY + 7200 + DAY, 2010),
+    ]
+
+
+def test_record_players_uses_last_match_time(history):
+    players = [
+        {
+            "name": "Viper",
+            "profile_id": 1,
+            "leaderboard": 3,
+            "rating": 2000,
+            "last_match_time": MONDAY,
+        },
+        {"name": "Viper", "profile_id": 1, "leaderboard": 4, "rating": None},
+    ]
+    assert history.record_players(players) == 1
+    assert history.record_players(players) == 0
+    assert history.profile_id("viper") == 1
+    assert history.query(1, 3, MONDAY - DAY, MONDAY + DAY, "raw")[1][0][0] == MONDAY
+
+
+def test_rollups_keep_min_max_and_last(history):
+    for hour, rating in enumerate([2000, 2050, 1980, 2020]):
+        history.record("Viper", 1, 3, rating, MONDAY + hour * 3600)
+    history.record("Viper", 1, 3, 2100, MONDAY + DAY)
+
+    assert history.query(1, 3, MONDAY, MONDAY + WEEK, "daily")[1] == [
+        (MONDAY, 1980, 2050, 2020),
+        (MONDAY + DAY, 2100, 2100, 2100),
+    ]
+    assert history.query(1, 3, MONDAY, MONDAY + WEEK, "weekly")[1] == [
+        (MONDAY, 1980, 2100, 2100),
+    ]
+
+
+@pytest.mark.parametrize(
+    "days, resolution",
+    [(1, "raw"), (30, "raw"), (31, "daily"), (730, "daily"), (731, "weekly")],
+)
+def test_resolution_follows_the_range(history, days, resolution):
+    end = MONDAY + 1000 * DAY
+    assert history.query(1, 3, end - days * DAY, end)[0] == resolution
+
+
+def test_full_chunks_roll_over(history):
+    history._chunk_size = 4
+    for n in range(10):
+        history.record("Viper", 1, 3, 2000 + n, MONDAY + n)
+
+    _, points = history.query(1, 3, MONDAY, MONDAY + DAY, "raw")
+    assert [last for _, _, _, last in points] == [2000 + n for n in range(10)]
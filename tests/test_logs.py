@@ -0,0 +1,71 @@
+import logging
+
+import pytest
+
+from aoe2bot import logs
+
+
+class Clock:
+    """A monotonic clock that only moves when told to."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(logs.time, "monotonic", clock)
+    return clock
+
+
+def record(level: int = logging.DEBUG, lineno: int = 1) -> logging.LogRecord:
+    return logging.LogRecord("test", level, "test.py", lineno, "message", None, None)
+
+
+def test_sampling_allows_a_burst_then_the_rate(clock):
+    sampler = logs.SamplingFilter(rate=2.0, burst=3.0, sample=0.0)
+    assert [sampler.filter(record()) for _ in range(4)] == [True, True, True, False]
+
+    clock.now += 0.5
+    assert sampler.filter(record())
+    assert not sampler.filter(record())
+
+
+def test_sampling_counts_dropped_records(clock):
+    sampler = logs.SamplingFilter(rate=1.0, burst=1.0, sample=0.0)
+    assert sampler.filter(record())
+    for _ in range(5):
+        assert not sampler.filter(record())
+
+    clock.now += 1.0
+    passed = record()
+    assert sampler.filter(passed)
+    assert passed.dropped == 5
+
+
+def test_sampling_is_per_call_site_and_level(clock):
+    sampler = logs.SamplingFilter(rate=1.0, burst=1.0, sample=0.0)
+    assert sampler.filter(record(lineno=1))
+    assert not sampler.filter(record(lineno=1))
+    assert sampler.filter(record(lineno=2))
+    assert sampler.filter(record(logging.INFO, lineno=1))
+
+
+def test_sampling_lets_a_fraction_through(clock, monkeypatch):
+    sampler = logs.SamplingFilter(rate=1.0, burst=1.0, sample=0.5)
+    sampler.filter(record())
+    monkeypatch.setattr(logs.random, "random", lambda: 0.25)
+    assert sampler.filter(record())
+    monkeypatch.setattr(logs.random, "random", lambda: 0.75)
+    assert not sampler.filter(record())
+
+
+def test_text_context_shows_dropped_records():
+    passed = record()
+    passed.dropped = 3
+    logs.ContextFilter().filter(passed)
+    assert passed.context == " (3 dropped)"
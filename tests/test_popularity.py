@@ -0,0 +1,73 @@
+import pytest
+
+from aoe2bot import popularity
+from aoe2bot.popularity import Popularity, lookup_key, parse_lookup_key
+
+
+class Clock:
+    """A wall clock that only moves when told to."""
+
+    def __init__(self) -> None:
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(popularity.time, "time", clock)
+    return clock
+
+
+def test_scores_halve_every_half_life(clock):
+    tracker = Popularity(half_life=100.0)
+    for _ in range(4):
+        tracker.record("elo:1:a")
+
+    clock.now += 100.0
+    assert tracker.top(1) == [("elo:1:a", pytest.approx(2.0))]
+    clock.now += 100.0
+    assert tracker.top(1) == [("elo:1:a", pytest.approx(1.0))]
+
+
+def test_recent_hits_outrank_old_ones(clock):
+    tracker = Popularity(half_life=100.0)
+    for _ in range(3):
+        tracker.record("elo:1:old")
+    clock.now += 200.0
+    tracker.record("elo:2:new")
+    tracker.record("elo:2:new")
+
+    assert [key for key, _ in tracker.top(2)] == ["elo:2:new", "elo:1:old"]
+
+
+def test_eviction_keeps_the_most_popular(clock):
+    tracker = Popularity(max_keys=10)
+    for n in range(10):
+        for _ in range(n + 1):
+            tracker.record(f"elo:{n}:player")
+    tracker.record("elo:new:player")
+
+    keys = [key for key, _ in tracker.top(100)]
+    assert len(keys) == 9
+    assert "elo:9:player" in keys
+    assert "elo:0:player" not in keys
+
+
+def test_load_merges_decayed_scores(clock):
+    tracker = Popularity(half_life=100.0)
+    tracker.record("elo:1:a")
+    dumped = tracker.dump()
+
+    clock.now += 100.0
+    restored = Popularity(half_life=100.0)
+    restored.record("elo:1:a")
+    restored.load(dumped)
+    assert restored.top(1) == [("elo:1:a", pytest.approx(1.5))]
+
+
+def test_lookup_key_keeps_names_with_colons():
+    key = lookup_key("civs", 459658, "[aM] a:b")
+    assert parse_lookup_key(key) == ("civs", "459658", "[aM] a:b")
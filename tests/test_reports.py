@@ -0,0 +1,32 @@
+import csv
+import gzip
+import io
+
+from aoe2bot.reports import build_civs_report
+
+CIVS = {1: "Britons", 2: "Franks"}
+PLAYERS = [("Viper", [(1, True), (1, False), (2, None), (99, True)])]
+
+
+def rows(report: bytes) -> list:
+    return list(csv.DictReader(io.StringIO(report.decode())))
+
+
+def test_report_counts_results_per_civ():
+    report, compressed = build_civs_report(PLAYERS, CIVS)
+    assert not compressed
+    assert [
+        (row["civ"], row["wins"], row["losses"], row["custom"], row["total"])
+        for row in rows(report)
+    ] == [("Britons", "1", "1", "0", "2"), ("Franks", "0", "0", "1", "1")]
+
+
+def test_report_is_gzipped_only_above_the_threshold():
+    plain, _ = build_civs_report(PLAYERS, CIVS)
+
+    report, compressed = build_civs_report(PLAYERS, CIVS, len(plain))
+    assert (report, compressed) == (plain, False)
+
+    report, compressed = build_civs_report(PLAYERS, CIVS, len(plain) - 1)
+    assert compressed
+    assert gzip.decompress(report) == plain